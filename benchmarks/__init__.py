@@ -0,0 +1,17 @@
+import os
+
+import pygame
+import pygame._sdl2 as pg_sdl2  # noqa
+
+from src import common, settings
+
+
+def init_display() -> None:
+    # benchmarks don't need to show anything, the dummy driver keeps them runnable anywhere
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    common.window = pygame.Window(title=settings.TITLE, size=settings.WINDOW_SIZE)
+    common.renderer = pg_sdl2.Renderer(common.window)
+    common.renderer.logical_size = settings.SIZE
+    common.clock = pygame.Clock()
@@ -0,0 +1,70 @@
+import statistics
+import time
+
+from . import init_display
+
+init_display()
+
+import pygame  # noqa: E402
+
+from src import assets, common, settings, states  # noqa: E402
+
+# the biggest dt the main loop lets through, i.e. the deepest penetrations
+DT = 0.05
+FRAMES_PER_DROP = 10
+
+
+def run(resolver: str) -> tuple[list[int], list[float]]:
+    settings.COLLISION_RESOLVER = resolver
+    gameplay = states.GamePlay()
+    gameplay.player.terminal_y_vel = 700
+
+    mask_tests = []
+    times = []
+    handle_collisions = gameplay.handle_collisions
+
+    def timed_handle_collisions():
+        gameplay.colliders.mask_tests = 0
+        start = time.perf_counter()
+        handle_collisions()
+        times.append(time.perf_counter() - start)
+        mask_tests.append(gameplay.colliders.mask_tests)
+
+    gameplay.handle_collisions = timed_handle_collisions
+
+    map_width, map_height = gameplay.level.map_size
+    cell_width, cell_height = gameplay.level.collider_cell_size
+    for x in range(cell_width, map_width - cell_width, cell_width + cell_width // 2):
+        for y in range(cell_height * 2, map_height - cell_height * 2, cell_height * 3):
+            gameplay.reset()
+            rect = gameplay.player.collision_rect.move_to(center=(x, y))
+            if gameplay.mask_collides_any(rect, gameplay.player.mask):
+                continue
+            gameplay.player.position.xy = rect.center
+            gameplay.player.collision_rect.center = rect.center
+            gameplay.player.velocity.xy = 0, gameplay.player.terminal_y_vel
+            for _ in range(FRAMES_PER_DROP):
+                gameplay.update()
+
+    return mask_tests, times
+
+
+def main() -> None:
+    assets.load_assets()
+    common.events = []
+    common.keys = pygame.key.get_pressed()
+    common.dt = DT
+
+    for resolver in ["bfs", "swept"]:
+        mask_tests, times = run(resolver)
+        print(
+            f"{resolver:>5}: {len(times)} resolves | "
+            f"mask tests per frame mean {statistics.mean(mask_tests):6.2f} "
+            f"max {max(mask_tests):4d} | "
+            f"resolve time mean {statistics.mean(times) * 1e6:7.1f} us "
+            f"worst {max(times) * 1e6:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import time
+
+from src import headless
+
+headless.init()
+
+import pygame  # noqa: E402
+
+from src import assets, common, settings, states  # noqa: E402
+
+TICKS = 5000
+
+
+def main() -> None:
+    start = time.perf_counter()
+    assets.load_assets()
+    print(f"assets: {(time.perf_counter() - start) * 1000:7.2f} ms")
+    common.events = []
+    common.keys = pygame.key.get_pressed()
+    common.dt = 1 / settings.TICK_RATE
+
+    for state_class in [states.GamePlay, states.Tutorial]:
+        start = time.perf_counter()
+        state = state_class()
+        print(
+            f"{state_class.__name__}(): {(time.perf_counter() - start) * 1000:7.2f} ms"
+        )
+
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            state.update()
+        elapsed = time.perf_counter() - start
+        print(f"  update only:   {TICKS / elapsed:9.0f} ticks/s")
+
+        common.renderer.draw_calls = 0
+        drawn = culled = 0
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            state.update()
+            state.draw()
+            common.renderer.present()
+            drawn += state.drawn_count
+            culled += state.culled_count
+        elapsed = time.perf_counter() - start
+        print(
+            f"  update + draw: {TICKS / elapsed:9.0f} ticks/s | "
+            f"{common.renderer.draw_calls / TICKS:.0f} draw calls per frame | "
+            f"{drawn / TICKS:.0f} objects drawn, {culled / TICKS:.0f} culled per frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import statistics
+import time
+
+from . import init_display
+
+init_display()
+
+from src import level  # noqa: E402
+
+ROUNDS = 20
+
+
+def snake(width: int, rows: int) -> set[tuple[int, int]]:
+    # one long joiner going back and forth, rows two apart so they don't touch
+    nodes = set()
+    for row in range(rows):
+        y = row * 2
+        nodes.update((x, y) for x in range(width))
+        if row < rows - 1:
+            nodes.add((width - 1 if row % 2 == 0 else 0, y + 1))
+    return nodes
+
+
+def short_ones(count: int, length: int) -> set[tuple[int, int]]:
+    # lots of little vertical joiners next to each other with a column of space
+    return {(x * 2, y) for x in range(count) for y in range(length)}
+
+
+def measure(nodes: set[tuple[int, int]]) -> tuple[list[float], list, list]:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        paths, broken = level.GridGraph(nodes).paths()
+        times.append(time.perf_counter() - start)
+    return times, paths, broken
+
+
+def main() -> None:
+    cases = {
+        "snake": snake(200, 50),
+        "line": {(x, 0) for x in range(10_000)},
+        "short ones": short_ones(2500, 4),
+    }
+    # a single tile, a fork and a loop, all of them should get reported
+    broken_nodes = snake(200, 50) | {(500, 500)}
+    broken_nodes |= {(510, 500), (511, 500), (512, 500), (511, 501)}
+    broken_nodes |= {(520, 499), (520, 500), (521, 499), (521, 500)}
+    cases["snake + broken"] = broken_nodes
+
+    for label, nodes in cases.items():
+        times, paths, broken = measure(nodes)
+        print(
+            f"{label:>14}: {len(nodes):6} tiles, {len(paths):5} paths, "
+            f"{len(broken)} broken | "
+            f"mean {statistics.mean(times) * 1000:7.2f} ms | "
+            f"min {min(times) * 1000:7.2f} ms"
+        )
+
+    paths, _ = level.GridGraph(cases["snake"]).paths()
+    assert [(start, end) for start, end, _ in paths] == [((0, 0), (0, 98))]
+    _, broken = level.GridGraph(broken_nodes).paths()
+    assert sorted(broken) == [(500, 500), (510, 500), (520, 499)], broken
+
+
+if __name__ == "__main__":
+    main()
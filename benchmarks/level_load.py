@@ -0,0 +1,49 @@
+import statistics
+import sys
+import time
+
+from . import init_display
+
+init_display()
+
+from src import assets, level, level_cache  # noqa: E402
+
+ROUNDS = 20
+
+
+def measure(name: str, use_cache: bool) -> list[float]:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        level.Level(name, 0, use_cache=use_cache)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(names: list[str]) -> None:
+    assets.load_assets()
+    for name in names:
+        level_cache.bake(name, 0)
+        print(f"{name} ({level_cache.cache_path(name, 0).stat().st_size} bytes baked)")
+        loaded = level.Level(name, 0)
+        surface_bytes = sum(
+            tile.get_width() * tile.get_height() * tile.get_bytesize()
+            for tile_set in loaded.tile_sets
+            for tile in tile_set.tiles
+        )
+        texture_bytes = sum(page.width * page.height * 4 for page in loaded.atlas.pages)
+        print(
+            f"  {len(loaded.tile_sets)} tile sets, {surface_bytes // 1024} KiB decoded | "
+            f"{len(loaded.atlas.pages)} atlas pages, {texture_bytes // 1024} KiB uploaded"
+        )
+        for label, use_cache in [("json", False), ("baked", True)]:
+            times = measure(name, use_cache)
+            print(
+                f"  {label:>5}: "
+                f"mean {statistics.mean(times) * 1000:7.2f} ms | "
+                f"min {min(times) * 1000:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["map_1", "map_2"])
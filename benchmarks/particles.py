@@ -0,0 +1,55 @@
+import random
+import statistics
+import time
+
+from src import headless
+
+# rendering goes to the headless stand-ins, so it's only the cost on the Python side
+headless.init()
+
+import pygame  # noqa: E402
+
+from src import assets, common, particles, settings  # noqa: E402
+
+COUNTS = [100, 10_000, 100_000]
+# steam particles live for 2.1 s, so everything stays alive for all the frames
+FRAMES = 60
+
+
+def main() -> None:
+    assets.load_assets()
+    common.dt = 1 / settings.TICK_RATE
+    camera = pygame.Vector2(100, 100)
+    random.seed(0)
+
+    for count in COUNTS:
+        manager = particles.ParticleManager(assets.images["steam_particle"])
+        start = time.perf_counter()
+        for _ in range(count):
+            manager.spawn(
+                pygame.Vector2(random.uniform(0, 400), random.uniform(0, 200)),
+                pygame.Vector2(0, -1).rotate(random.randint(-3, 3)) * 45,
+            )
+        spawn_time = time.perf_counter() - start
+
+        update_times = []
+        render_times = []
+        for _ in range(FRAMES):
+            start = time.perf_counter()
+            manager.update()
+            update_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            manager.render(camera)
+            render_times.append(time.perf_counter() - start)
+
+        print(
+            f"{count:>7} particles | "
+            f"spawn {spawn_time * 1000:9.3f} ms | "
+            f"update {statistics.mean(update_times) * 1000:9.3f} ms/frame | "
+            f"render {statistics.mean(render_times) * 1000:9.3f} ms/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import statistics
+import time
+
+from . import init_display
+
+init_display()
+
+from src import assets, common, settings, states  # noqa: E402
+
+ROUNDS = 50
+
+
+def main() -> None:
+    assets.load_assets()
+    common.events = []
+    common.dt = 1 / settings.FPS
+
+    start = time.perf_counter()
+    gameplay = states.GamePlay()
+    print(f"first GamePlay(): {(time.perf_counter() - start) * 1000:7.2f} ms")
+
+    for label, func in [
+        ("GamePlay()", states.GamePlay),
+        ("GamePlay.reset()", gameplay.reset),
+    ]:
+        times = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        print(
+            f"{label:>18}: "
+            f"mean {statistics.mean(times) * 1000:7.3f} ms | "
+            f"max {max(times) * 1000:7.3f} ms"
+        )
+    print(f"(one frame at {settings.FPS} FPS is {1000 / settings.FPS:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROUNDS = 10
+
+
+def first_menu_frame(eager: bool, workers: int) -> tuple[float, float, int]:
+    # from a fresh interpreter (pygame imported) to the first main menu frame
+    start = time.perf_counter()
+    from . import init_display
+
+    init_display()
+
+    from src import assets, common, states
+
+    assets.workers = workers
+    if eager:
+        # what startup used to do, everything before the menu shows up
+        assets.load_assets()
+    common.set_current_state(states.MainMenu())
+    common.get_current_state().draw()
+    common.renderer.present()
+    elapsed = time.perf_counter() - start
+    # fonts only get opened per size when they're looked up, so this is just the
+    # ones that were actually needed
+    faces = assets.fonts.loaded.values()
+    font_time = sum(face.load_time for face in faces)
+    return elapsed, font_time, sum(len(face.fonts) for face in faces)
+
+
+def main() -> None:
+    # decoding is spread over the asset workers, so see how it goes with more of them
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores})
+    runs = [("eager", workers) for workers in worker_counts] + [("lazy", cores)]
+    for mode, workers in runs:
+        times, font_times = [], []
+        for _ in range(ROUNDS):
+            # every round in its own process, nothing's loaded or cached yet
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", mode, str(workers)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            elapsed, font_time, font_count = output.split()[-3:]
+            times.append(float(elapsed))
+            font_times.append(float(font_time))
+        print(
+            f"{mode:>5}, {workers:2} worker(s): "
+            f"mean {statistics.mean(times) * 1000:7.2f} ms | "
+            f"min {min(times) * 1000:7.2f} ms | "
+            f"{font_count:>2} fonts {statistics.mean(font_times) * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(*first_menu_frame(sys.argv[1] == "eager", int(sys.argv[2])))
+    else:
+        main()
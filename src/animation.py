@@ -3,7 +3,7 @@ import itertools
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from . import spritesheet, enums
+from . import spritesheet, enums, common
 
 
 class EntityAnimation:
@@ -28,7 +28,7 @@ class EntityAnimation:
         # if states is not None:
         #     self.states = states
 
-        current_time = pygame.time.get_ticks()
+        current_time = common.ticks
         if current_time - self._last_time >= self._sprite["duration"] or (
             state is not None and state != self.state
         ):
@@ -65,7 +65,7 @@ class LoadingBarAnimation:
         # if states is not None:
         #     self.states = states
 
-        current_time = pygame.time.get_ticks()
+        current_time = common.ticks
         if current_time - self._last_time >= self._sprite["duration"] or (
             state is not None and state != self.state
         ):
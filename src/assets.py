@@ -1,18 +1,120 @@
+import collections
+import collections.abc
+import concurrent.futures
 import functools
+import io
 import os
 import json
 import pathlib
+import time
 
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
 from .spritesheet import AsepriteSpriteSheet
-from . import common, level
+from . import atlas, common, level, spritesheet
 
-images: dict = {}
-sfx: dict[str, pygame.mixer.Sound] = {}
-maps = {}
-fonts: dict[str, dict[int, pygame.Font]] = {}
+# images and sprite sheet frames end up on a few shared pages, see atlas.py
+sprite_atlas = atlas.Atlas()
+# decoding (reading files, PNGs, MP3s, JSON) happens on these, pygame lets go of the
+# GIL while it decodes, set before anything gets loaded to use a different amount
+workers = os.cpu_count() or 1
+_pool: concurrent.futures.ThreadPoolExecutor | None = None
+
+
+class Registry(collections.abc.Mapping):
+    # loads things the first time they're asked for instead of all up front, and
+    # counts how many states are holding on to each, once nobody is they get
+    # dropped (and loaded again if anyone asks later),
+    # loaders are (decode, finish) pairs, decode does the slow part and runs on a
+    # worker if threaded is set, finish turns that into the actual asset on the
+    # main thread (atlas regions and such)
+    def __init__(self, loaders: dict, on_load=None, threaded: bool = True):
+        self.loaders = loaders
+        self.on_load = on_load
+        self.threaded = threaded
+        self.loaded = {}
+        self.refs = collections.Counter()
+
+    def __getitem__(self, key):
+        try:
+            return self.loaded[key]
+        except KeyError:
+            self.load([key])
+            return self.loaded[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.loaders
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+    def __len__(self) -> int:
+        return len(self.loaders)
+
+    def load(self, keys) -> None:
+        load_many([(self, keys)])
+
+    def acquire(self, keys) -> None:
+        self.load(keys)
+        self.refs.update(keys)
+
+    def release(self, keys) -> None:
+        for key in keys:
+            self.refs[key] -= 1
+            if self.refs[key] <= 0:
+                del self.refs[key]
+                self.loaded.pop(key, None)
+
+
+def get_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = concurrent.futures.ThreadPoolExecutor(
+            workers, thread_name_prefix="assets"
+        )
+    return _pool
+
+
+def load_steps(wanted: list[tuple[Registry, list[str]]]):
+    # load_many a step at a time (see common.run_steps), yields the decodes it's
+    # waiting on, so states.Loading can keep drawing meanwhile
+    jobs = [
+        (registry, key)
+        for registry, keys in wanted
+        for key in dict.fromkeys(keys)
+        if key not in registry.loaded
+    ]
+    # a single thing isn't worth handing off, the main thread waits for it anyway
+    use_pool = sum(registry.threaded for registry, _ in jobs) > 1
+    futures = [
+        (
+            get_pool().submit(registry.loaders[key][0])
+            if use_pool and registry.threaded
+            else None
+        )
+        for registry, key in jobs
+    ]
+    # the rest gets decoded here meanwhile, then everything gets finished in the
+    # order it was asked for, so the atlas comes out the same every time
+    for (registry, key), future in zip(jobs, futures):
+        decode, finish = registry.loaders[key]
+        if future is None:
+            value = decode()
+        else:
+            if not future.done():
+                yield future
+            value = future.result()
+        if finish is not None:
+            value = finish(value)
+        registry.loaded[key] = value
+        if registry.on_load is not None:
+            registry.on_load(value)
+        yield
+
+
+def load_many(wanted: list[tuple[Registry, list[str]]]) -> None:
+    common.run_steps(load_steps(wanted))
 
 
 def image_path(path, extension="png"):
@@ -21,8 +123,13 @@ def image_path(path, extension="png"):
 
 def load_image(path):
     # return pygame.image.load(image_path(path)).convert_alpha()
+    # packed with everything else that's waiting on first draw, or by acquire
     surf = pygame.image.load(image_path(path))
-    return pg_sdl2.Texture.from_surface(common.renderer, surf)
+    return sprite_atlas.add(surf)
+
+
+def load_sprite_sheet(path):
+    return AsepriteSpriteSheet(image_path(path), sprite_atlas=sprite_atlas)
 
 
 def load_image_as_surface(path):
@@ -33,8 +140,55 @@ def load_sound(path, extension="mp3"):
     return pygame.mixer.Sound(os.path.join("assets/sfx", f"{path}.{extension}"))
 
 
-def load_fonts(path, sizes):
-    return {size: pygame.Font(os.path.join("assets", path), size) for size in sizes}
+def image_loader(path):
+    return functools.partial(load_image_as_surface, path), sprite_atlas.add
+
+
+def surface_loader(path):
+    return functools.partial(load_image_as_surface, path), None
+
+
+def sprite_sheet_loader(path):
+    path = image_path(path)
+    return functools.partial(spritesheet.decode, path), lambda decoded: (
+        AsepriteSpriteSheet(path, sprite_atlas=sprite_atlas, decoded=decoded)
+    )
+
+
+class FontFace(collections.abc.Mapping):
+    # one font file, sizes -> pygame.Font, but a size only gets opened the first
+    # time it's looked up, the file itself is read once and every size opens it
+    # from memory (None is pygame's default font)
+    def __init__(self, path: str | None, sizes: list[int]):
+        self.path = path
+        self.sizes = sizes
+        self.data = None
+        if path is not None:
+            with open(os.path.join("assets", path), "rb") as file:
+                self.data = file.read()
+        self.fonts: dict[int, pygame.Font] = {}
+        # how long opening the sizes took, for benchmarks.startup
+        self.load_time = 0.0
+
+    def __getitem__(self, size: int) -> pygame.Font:
+        font = self.fonts.get(size)
+        if font is None:
+            if size not in self.sizes:
+                raise KeyError(size)
+            start = time.perf_counter()
+            source = None if self.data is None else io.BytesIO(self.data)
+            font = self.fonts[size] = pygame.Font(source, size)
+            self.load_time += time.perf_counter() - start
+        return font
+
+    def __contains__(self, size) -> bool:
+        return size in self.sizes
+
+    def __iter__(self):
+        return iter(self.sizes)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
 
 
 @functools.cache
@@ -54,91 +208,165 @@ def level_path(path, extension="json"):
     return os.path.join("assets/maps", f"{path}.{extension}")
 
 
+# applied to sounds that get loaded later on too
+sound_volume = None
+
+
 def set_sound_volume(value):
-    for sound in sfx.values():
+    global sound_volume
+    sound_volume = value
+    for sound in sfx.loaded.values():
         sound.set_volume(value)
 
 
+def apply_sound_volume(sound):
+    if sound_volume is not None:
+        sound.set_volume(sound_volume)
+
+
 def stop_all_sounds():
-    for sound in sfx.values():
+    for sound in sfx.loaded.values():
         sound.stop()
 
 
+PIXELIFY_SIZES = [4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 28, 32]
+
+
+def font_loader(file_name):
+    path = f"Pixelify_Sans/static/{file_name}"
+    return functools.partial(FontFace, path, PIXELIFY_SIZES), None
+
+
+images = Registry(
+    {
+        "title": image_loader("title_wrapped"),
+        "player": sprite_sheet_loader("player"),
+        "ice_cube": image_loader("ice_cube"),
+        "ice_cube_invalid": image_loader("ice_cube_invalid"),
+        "ice_cube_icon": (
+            functools.partial(load_image_as_surface, "ice_cube_icon"),
+            lambda surf: level.TextureTile((0, 0), (0, 0), sprite_atlas.add(surf)),
+        ),
+        "steam_particle": sprite_sheet_loader("steam_particle"),
+        "rope": image_loader("rope"),
+        "freezer_loading_bar": sprite_sheet_loader("freezer_loading_bar"),
+        "fire_particles": sprite_sheet_loader("fire_particles"),
+        "ice_particles": sprite_sheet_loader("ice_particles"),
+        "dust_particles": sprite_sheet_loader("dust_particles"),
+        "magic_particles": sprite_sheet_loader("magic_particles"),
+        "item_frame": image_loader("item_frame"),
+        "item_frame_selected": image_loader("item_frame_selected"),
+        "water_top": image_loader("water_top"),
+        "water_body": image_loader("water_body"),
+        "button": image_loader("button"),
+        "button_surf": surface_loader("button"),
+        "button_pressed_surf": surface_loader("button_pressed"),
+        "button_pressed_blue_surf": surface_loader("button_pressed_blue"),
+        "button_pressed_green_surf": surface_loader("button_pressed_green"),
+        "button_pressed_yellow_surf": surface_loader("button_pressed_yellow"),
+        "selector_arrow": image_loader("selector_arrow"),
+        "door_open": image_loader("door_open"),
+        # "tiles": load_tiles,
+    }
+)
+sfx = Registry(
+    {
+        name: (functools.partial(load_sound, name), None)
+        for name in ["pop", "ding", "humm", "splash", "no", "knock"]
+    },
+    on_load=apply_sound_volume,
+)
+maps = {}
+fonts = Registry(
+    {
+        "default": (functools.partial(FontFace, None, [16, 12, 10]), None),
+        "pixelify_regular": font_loader("PixelifySans-Regular.ttf"),
+        "pixelify_bold": font_loader("PixelifySans-Bold.ttf"),
+        "pixelify_medium": font_loader("PixelifySans-Medium.ttf"),
+        "pixelify_semibold": font_loader("PixelifySans-SemiBold.ttf"),
+    },
+    # FreeType still isn't thread safe, but decoding a face only reads its file,
+    # the sizes get opened on the main thread when they're looked up (FontFace),
+    # so these can go on the pool like everything else
+)
+registries = {"images": images, "sfx": sfx, "fonts": fonts}
+
+# what a state wants loaded before it's shown, states list theirs in asset_groups,
+# anything not in here still works, it just loads the first time it's used
+GROUPS = {
+    "loading": {"images": ["freezer_loading_bar"]},
+    "menu": {
+        "images": [
+            "title",
+            "selector_arrow",
+            "button_surf",
+            "button_pressed_surf",
+            "button_pressed_blue_surf",
+            "button_pressed_green_surf",
+            "button_pressed_yellow_surf",
+        ],
+        "fonts": ["pixelify_semibold"],
+    },
+    "gameplay": {
+        "images": [
+            "player",
+            "ice_cube",
+            "ice_cube_invalid",
+            "ice_cube_icon",
+            "steam_particle",
+            "rope",
+            "freezer_loading_bar",
+            "fire_particles",
+            "ice_particles",
+            "dust_particles",
+            "magic_particles",
+            "item_frame",
+            "item_frame_selected",
+            "water_top",
+            "water_body",
+            "door_open",
+        ],
+        "sfx": ["pop", "ding", "humm", "splash", "no", "knock"],
+        "fonts": ["pixelify_semibold"],
+    },
+}
+
+
+def group_items(groups) -> list[tuple[Registry, list[str]]]:
+    return [
+        (registries[registry_name], keys)
+        for group in groups
+        for registry_name, keys in GROUPS[group].items()
+    ]
+
+
+def load_groups(*groups: str):
+    # everything in one go, so it all gets decoded at once, a step at a time
+    yield from load_steps(group_items(groups))
+    # one pack for the whole lot, instead of a page per image on first draw
+    sprite_atlas.pack()
+
+
+def reserve(*groups: str) -> None:
+    # counted as in use without loading anything yet, release them the same way,
+    # for loading them later on (states.Loading) without what's already loaded
+    # getting dropped in between
+    for registry, keys in group_items(groups):
+        registry.refs.update(keys)
+
+
+def acquire(*groups: str) -> None:
+    common.run_steps(load_groups(*groups))
+    for registry, keys in group_items(groups):
+        registry.acquire(keys)
+
+
+def release(*groups: str) -> None:
+    for registry, keys in group_items(groups):
+        registry.release(keys)
+
+
 def load_assets():
-    images.update(
-        {
-            "title": load_image("title_wrapped"),
-            "player": AsepriteSpriteSheet(image_path("player")),
-            "ice_cube": load_image("ice_cube"),
-            "ice_cube_invalid": load_image("ice_cube_invalid"),
-            "ice_cube_icon": level.TextureTile(
-                (0, 0), (0, 0), load_image("ice_cube_icon")
-            ),
-            "steam_particle": AsepriteSpriteSheet(image_path("steam_particle")),
-            "rope": load_image("rope"),
-            "freezer_loading_bar": AsepriteSpriteSheet(
-                image_path("freezer_loading_bar")
-            ),
-            "fire_particles": AsepriteSpriteSheet(image_path("fire_particles")),
-            "ice_particles": AsepriteSpriteSheet(image_path("ice_particles")),
-            "dust_particles": AsepriteSpriteSheet(image_path("dust_particles")),
-            "magic_particles": AsepriteSpriteSheet(image_path("magic_particles")),
-            "item_frame": load_image("item_frame"),
-            "item_frame_selected": load_image("item_frame_selected"),
-            "water_top": load_image("water_top"),
-            "water_body": load_image("water_body"),
-            "button": load_image("button"),
-            "button_surf": load_image_as_surface("button"),
-            "button_pressed_surf": load_image_as_surface("button_pressed"),
-            "button_pressed_blue_surf": load_image_as_surface("button_pressed_blue"),
-            "button_pressed_green_surf": load_image_as_surface("button_pressed_green"),
-            "button_pressed_yellow_surf": load_image_as_surface("button_pressed_yellow"),
-            "selector_arrow": load_image("selector_arrow"),
-            "door_open": load_image("door_open"),
-            # "tiles": load_tiles(),
-        }
-    )
-    sfx.update(
-        {
-            "pop": load_sound("pop"),
-            "ding": load_sound("ding"),
-            "humm": load_sound("humm"),
-            "splash": load_sound("splash"),
-            "no": load_sound("no"),
-            "knock": load_sound("knock"),
-        }
-    )
-    # # maps.update({"level_1": Level(level_path("level_1"), load_tiles())})
-    fonts.update(
-        {
-            "default": {
-                16: pygame.Font(None, 16),
-                12: pygame.Font(None, 12),
-                10: pygame.Font(None, 10),
-            },
-            "pixelify_regular": {
-                **load_fonts(
-                    "Pixelify_Sans/static/PixelifySans-Regular.ttf",
-                    [4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 28, 32],
-                )
-            },
-            "pixelify_bold": {
-                **load_fonts(
-                    "Pixelify_Sans/static/PixelifySans-Bold.ttf",
-                    [4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 28, 32],
-                )
-            },
-            "pixelify_medium": {
-                **load_fonts(
-                    "Pixelify_Sans/static/PixelifySans-Medium.ttf",
-                    [4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 28, 32],
-                )
-            },
-            "pixelify_semibold": {
-                **load_fonts(
-                    "Pixelify_Sans/static/PixelifySans-SemiBold.ttf",
-                    [4, 5, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 28, 32],
-                )
-            },
-        }
-    )
+    # everything, right now, for benchmarks and such that don't go through states
+    load_many([(registry, list(registry.loaders)) for registry in registries.values()])
+    sprite_atlas.pack()
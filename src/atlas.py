@@ -0,0 +1,165 @@
+import weakref
+
+import pygame
+import pygame._sdl2 as pg_sdl2  # noqa
+
+from . import common
+
+# packs lots of small images into a few big textures (pages), so there's only a
+# handful of GPU textures instead of one per sprite frame/tile/image and draws
+# from the same page can go one after another without switching textures,
+# a region is a (page, srcrect) handle that can be used just like a Texture
+
+
+class AtlasPage:
+    def __init__(self, texture: pg_sdl2.Texture):
+        self.texture = texture
+        self.texture.blend_mode = pygame.BLENDMODE_BLEND
+        # what's currently set on the texture, so regions only touch SDL when
+        # they actually need something different
+        self.alpha = self.texture.alpha
+        self.color = pygame.Color(self.texture.color)
+        self.blend_mode = self.texture.blend_mode
+
+    @property
+    def width(self) -> int:
+        return self.texture.width
+
+    @property
+    def height(self) -> int:
+        return self.texture.height
+
+    def apply(self, alpha: int, color: pygame.Color, blend_mode: int) -> None:
+        if alpha != self.alpha:
+            self.texture.alpha = self.alpha = alpha
+        if color != self.color:
+            self.texture.color = color
+            self.color = pygame.Color(color)
+        if blend_mode != self.blend_mode:
+            self.texture.blend_mode = self.blend_mode = blend_mode
+
+
+class AtlasRegion:
+    page: AtlasPage | None
+
+    def __init__(self, size: tuple[int, int], atlas: "Atlas | None" = None):
+        # the page and where exactly on it only get filled in by Atlas.pack
+        self.page = None
+        self.atlas = atlas
+        self.srcrect = pygame.Rect((0, 0), size)
+        # what it was made from, for masks (see masks.py)
+        self.source: pygame.Surface | None = None
+        self.width, self.height = size
+        # these are per region, not per page, just like they'd be per texture
+        self.alpha = 255
+        self.color = pygame.Color(255, 255, 255)
+        self.blend_mode = pygame.BLENDMODE_BLEND
+
+    def get_rect(self, **kwargs) -> pygame.Rect:
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        for key, value in kwargs.items():
+            setattr(rect, key, value)
+        return rect
+
+    def draw(
+        self,
+        srcrect=None,
+        dstrect=None,
+        angle=0,
+        origin=None,
+        flip_x=False,
+        flip_y=False,
+    ) -> None:
+        if srcrect is None:
+            page_srcrect = self.srcrect
+        else:
+            # srcrect is relative to the region and mustn't reach into its neighbours
+            page_srcrect = (
+                pygame.Rect(srcrect).move(self.srcrect.topleft).clip(self.srcrect)
+            )
+        if self.page is None:
+            # added after the last pack (loaded on demand), everything else that's
+            # waiting goes onto the same new page(s) with it
+            self.atlas.pack()
+        if dstrect is not None and len(dstrect) == 2:
+            # a position, a texture would use its own size here, so does the region
+            dstrect = (*dstrect, self.width, self.height)
+
+        self.page.apply(self.alpha, self.color, self.blend_mode)
+        self.page.texture.draw(
+            srcrect=page_srcrect,
+            dstrect=dstrect,
+            angle=angle,
+            origin=origin,
+            flip_x=flip_x,
+            flip_y=flip_y,
+        )
+
+
+class Atlas:
+    def __init__(self, page_size: tuple[int, int] = (1024, 1024), padding: int = 1):
+        self.page_size = page_size
+        # empty pixels around every region, so scaling never samples a neighbour
+        self.padding = padding
+        # pages live for as long as any of their regions do, so dropping every
+        # region on a page frees its texture too
+        self.pages: weakref.WeakSet[AtlasPage] = weakref.WeakSet()
+        self.pending: list[tuple[AtlasRegion, pygame.Surface]] = []
+
+    def add(self, surface: pygame.Surface) -> AtlasRegion:
+        region = AtlasRegion(surface.get_size(), self)
+        region.source = surface
+        self.pending.append((region, surface))
+        return region
+
+    def pack(self) -> None:
+        # shelf packing, tallest first, fill a row left to right, then start a new
+        # row under the tallest one in it, then a new page once that runs out
+        pending = sorted(
+            self.pending, key=lambda item: item[1].get_height(), reverse=True
+        )
+        self.pending = []
+        page_width, page_height = self.page_size
+        padding = self.padding
+
+        placed = []
+        page_blits = []
+        x = y = shelf_height = 0
+        for region, surface in pending:
+            width, height = surface.get_size()
+            if width + padding > page_width or height + padding > page_height:
+                # too big to share a page with anything, gets one to itself
+                self.upload(surface.get_size(), [(region, surface, (0, 0))])
+                continue
+            if x + width + padding > page_width:
+                x, y = 0, y + shelf_height
+                shelf_height = 0
+            if y + height + padding > page_height:
+                placed.append(page_blits)
+                page_blits = []
+                x = y = shelf_height = 0
+            page_blits.append((region, surface, (x, y)))
+            x += width + padding
+            shelf_height = max(shelf_height, height + padding)
+        if page_blits:
+            placed.append(page_blits)
+
+        for page_blits in placed:
+            used_width = max(pos[0] + region.width for region, _, pos in page_blits)
+            used_height = max(pos[1] + region.height for region, _, pos in page_blits)
+            self.upload((used_width, used_height), page_blits)
+
+    def upload(
+        self,
+        size: tuple[int, int],
+        page_blits: list[tuple[AtlasRegion, pygame.Surface, tuple[int, int]]],
+    ) -> None:
+        surf = pygame.Surface(size, flags=pygame.SRCALPHA)
+        # onto a fully transparent surface pygame's blit copies the pixels as they
+        # are (colorkeys turn transparent), SDL's blending would darken the edges
+        surf.fblits([(surface, pos) for _, surface, pos in page_blits])
+        page = AtlasPage(common.Texture.from_surface(common.renderer, surf))
+        self.pages.add(page)
+        for region, _, pos in page_blits:
+            region.page = page
+            region.srcrect.topleft = pos
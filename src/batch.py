@@ -0,0 +1,97 @@
+import operator
+
+import pygame._sdl2 as pg_sdl2  # noqa
+
+from . import atlas
+
+# collects the draws for a frame and submits them all at once in flush, sorted by
+# layer first and texture (atlas page) second, so draws from the same page end up
+# next to each other and the camera gets subtracted in one place instead of at
+# every call site with a new Vector2 each time,
+# sprites in the same layer can get reordered between textures, so anything that
+# has to be on top of something else goes in a later layer (see enums.DrawLayer),
+# pygame's Renderer has no way to submit textured geometry in bulk (yet), so it's
+# still one Texture.draw per sprite in the end, just without the overhead around it
+
+
+class SpriteBatch:
+    def __init__(self):
+        self.camera = (0.0, 0.0)
+        self.sprites = []
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def begin(self, camera=(0, 0)) -> None:
+        self.camera = tuple(camera)
+        self.sprites.clear()
+
+    def draw(
+        self,
+        texture: pg_sdl2.Texture | atlas.AtlasRegion,
+        position,
+        layer: int = 0,
+        size: tuple[float, float] | None = None,
+        srcrect=None,
+        angle: float = 0,
+        flip_x: bool = False,
+        alpha: int | None = None,
+        screen: bool = False,
+    ) -> None:
+        # position is in world space, unless screen is set (UI and such)
+        if size is None:
+            size = texture.width, texture.height
+        self.sprites.append(
+            (
+                layer,
+                # regions on the same page are the same texture as far as SDL cares
+                id(getattr(texture, "page", texture)),
+                len(self.sprites),
+                texture,
+                position[0],
+                position[1],
+                size,
+                srcrect,
+                angle,
+                flip_x,
+                alpha,
+                screen,
+            )
+        )
+
+    def flush(self) -> int:
+        # returns how many sprites got drawn
+        self.sprites.sort(key=operator.itemgetter(0, 1, 2))
+        camera_x, camera_y = self.camera
+        for (
+            _,
+            _,
+            _,
+            texture,
+            x,
+            y,
+            (width, height),
+            srcrect,
+            angle,
+            flip_x,
+            alpha,
+            screen,
+        ) in self.sprites:
+            if not screen:
+                x -= camera_x
+                y -= camera_y
+            if alpha is not None:
+                # textures (and regions) are shared, so it only holds for this draw
+                previous_alpha = texture.alpha
+                texture.alpha = alpha
+            texture.draw(
+                srcrect=srcrect,
+                dstrect=(x, y, width, height),
+                angle=angle,
+                flip_x=flip_x,
+            )
+            if alpha is not None:
+                texture.alpha = previous_alpha
+        drawn = len(self.sprites)
+        self.sprites.clear()
+        return drawn
@@ -0,0 +1,196 @@
+import collections
+import collections.abc
+import math
+
+import pygame
+
+Cell = tuple[int, int]
+
+
+class CollisionGrid:
+    # colliders are anything with a rect, a position and a mask,
+    # they're bucketed by grid cell in three layers:
+    #   static  - level geometry, never changes after construction
+    #   dynamic - persistent stuff added while playing (e.g. placed ice cubes)
+    #   frame   - stuff that moves around and is re-added every frame (e.g. lifts)
+
+    def __init__(self, cell_size: tuple[int, int], static: dict | None = None):
+        self.cell_size = self.cell_width, self.cell_height = cell_size
+        self.static: dict[Cell, tuple] = {}
+        self.dynamic: collections.defaultdict[Cell, list] = collections.defaultdict(
+            list
+        )
+        self.frame: dict[Cell, list] = {}
+        # cells that got something added to them this frame, only those need clearing
+        self._frame_cells: list[Cell] = []
+        self._layers = (self.static, self.dynamic, self.frame)
+        # how many times a collider mask was tested, for profiling the resolvers
+        self.mask_tests = 0
+
+        for cell, value in (static or {}).items():
+            if isinstance(value, collections.abc.Iterable):
+                self.static[cell] = tuple(value)
+            else:
+                self.static[cell] = (value,)
+
+    def add(self, cell: Cell, collider) -> None:
+        self.dynamic[cell].append(collider)
+
+    def add_frame(self, cell: Cell, collider) -> None:
+        colliders = self.frame.get(cell)
+        if colliders is None:
+            # the lists are kept around, so a cell only allocates the first time it's used
+            colliders = self.frame[cell] = []
+        if not colliders:
+            self._frame_cells.append(cell)
+        colliders.append(collider)
+
+    def clear_frame(self) -> None:
+        frame = self.frame
+        for cell in self._frame_cells:
+            frame[cell].clear()
+        self._frame_cells.clear()
+
+    def clear(self) -> None:
+        self.dynamic.clear()
+        self.clear_frame()
+
+    def __contains__(self, cell: Cell) -> bool:
+        for layer in self._layers:
+            if layer.get(cell):
+                return True
+        return False
+
+    def __getitem__(self, cell: Cell) -> list:
+        # convenient, but allocates, prefer the methods below in hot paths
+        items = []
+        for layer in self._layers:
+            colliders = layer.get(cell)
+            if colliders:
+                items.extend(colliders)
+        return items
+
+    def values(self):
+        for layer in self._layers:
+            for colliders in layer.values():
+                if colliders:
+                    yield colliders
+
+    def get_cells(self, rect) -> tuple[range, range]:
+        return (
+            range(
+                int(rect.x // self.cell_width), int(rect.right // self.cell_width) + 1
+            ),
+            range(
+                int(rect.y // self.cell_height),
+                int(rect.bottom // self.cell_height) + 1,
+            ),
+        )
+
+    def rect_collides(self, cell: Cell, rect, kind: type | None = None) -> bool:
+        for layer in self._layers:
+            colliders = layer.get(cell)
+            if not colliders:
+                continue
+            for collider in colliders:
+                if kind is not None and not isinstance(collider, kind):
+                    continue
+                if rect.colliderect(collider.rect):
+                    return True
+        return False
+
+    def mask_collides(self, cell: Cell, rect, mask: pygame.Mask) -> bool:
+        x, y = rect.topleft
+        for layer in self._layers:
+            colliders = layer.get(cell)
+            if not colliders:
+                continue
+            for collider in colliders:
+                position = collider.position
+                self.mask_tests += 1
+                if collider.mask.overlap(mask, (x - position.x, y - position.y)):
+                    return True
+        return False
+
+    def rect_collides_any(self, rect) -> bool:
+        columns, rows = self.get_cells(rect)
+        for grid_y in rows:
+            for grid_x in columns:
+                if self.rect_collides((grid_x, grid_y), rect):
+                    return True
+        return False
+
+    def mask_collides_any(self, rect, mask: pygame.Mask) -> bool:
+        columns, rows = self.get_cells(rect)
+        for grid_y in rows:
+            for grid_x in columns:
+                if self.mask_collides((grid_x, grid_y), rect, mask):
+                    return True
+        return False
+
+    def sweep(self, rect, dx: float, dy: float) -> tuple[float, bool]:
+        # moves the rect along one axis (either dx or dy has to be 0) and returns how far
+        # it can get before hitting something and whether it hit anything at all,
+        # the moving thing is treated as a box (the player's mask is filled anyway),
+        # only the colliders are tested pixel perfect, one mask test per collider
+        width, height = int(rect.width), int(rect.height)
+        x0, y0 = math.floor(rect.x), math.floor(rect.y)
+        x1, y1 = math.floor(rect.x + dx), math.floor(rect.y + dy)
+        left, top = min(x0, x1), min(y0, y1)
+        swept = pygame.Rect(
+            left, top, max(x0, x1) + width - left, max(y0, y1) + height - top
+        )
+        swept_mask = None
+
+        contact = None
+        columns, rows = self.get_cells(swept)
+        for grid_y in rows:
+            for grid_x in columns:
+                for layer in self._layers:
+                    colliders = layer.get((grid_x, grid_y))
+                    if not colliders:
+                        continue
+                    for collider in colliders:
+                        if not swept.colliderect(collider.rect):
+                            continue
+                        if swept_mask is None:
+                            swept_mask = pygame.Mask(swept.size, fill=True)
+
+                        position = collider.position
+                        # same truncation as Mask.overlap does with the offset
+                        offset_x = int(left - position.x)
+                        offset_y = int(top - position.y)
+                        self.mask_tests += 1
+                        overlap = collider.mask.overlap_mask(
+                            swept_mask, (offset_x, offset_y)
+                        )
+                        for hit in overlap.get_bounding_rects():
+                            hit.move_ip(left - offset_x, top - offset_y)
+                            if dx > 0:
+                                edge = hit.left - width
+                            elif dx < 0:
+                                edge = hit.right
+                            elif dy > 0:
+                                edge = hit.top - height
+                            else:
+                                edge = hit.bottom
+
+                            if contact is None:
+                                contact = edge
+                            elif dx > 0 or dy > 0:
+                                contact = min(contact, edge)
+                            else:
+                                contact = max(contact, edge)
+
+        if contact is None:
+            return (dx or dy), False
+
+        if dx:
+            distance = contact - rect.x
+            if dx > 0:
+                return pygame.math.clamp(distance, 0, dx), True
+            return pygame.math.clamp(distance, dx, 0), True
+        distance = contact - rect.y
+        if dy > 0:
+            return pygame.math.clamp(distance, 0, dy), True
+        return pygame.math.clamp(distance, dy, 0), True
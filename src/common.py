@@ -1,3 +1,4 @@
+import concurrent.futures
 import types
 
 import pygame
@@ -7,11 +8,20 @@ from . import stubs
 
 window: pygame.Window
 renderer: pg_sdl2.Renderer
+# create textures through this, so a headless run can swap in its stand-in
+Texture = pg_sdl2.Texture
 
 # screen: pygame.Surface  # using _sdl2
 
 dt: float
+# how far along rendering is between the last two simulation steps (0 to 1)
+alpha: float = 1.0
 events: list[pygame.Event]
+# read these instead of asking pygame directly, so a replay can feed them in
+keys: pygame.key.ScancodeWrapper
+mouse_pos: tuple[int, int] = (0, 0)
+# milliseconds of simulated time, advances with every simulation step
+ticks: int = 0
 clock: pygame.Clock
 
 _current_state: stubs.State
@@ -19,8 +29,28 @@ _current_state: stubs.State
 
 def set_current_state(state: stubs.State) -> None:
     global _current_state
+    from . import assets
+
+    # the new state's assets get taken before the old one's are let go, so the
+    # ones both use don't get dropped and loaded again in between
+    assets.acquire(*getattr(state, "asset_groups", ()))
+    if "_current_state" in globals():
+        assets.release(*getattr(_current_state, "asset_groups", ()))
     _current_state = state
 
 
 def get_current_state() -> stubs.State:
     return _current_state
+
+
+def run_steps(steps):
+    # runs a loading generator (see states.Loading) to the end right away and
+    # returns what it returns, steps can yield how far along they are (0 to 1) or
+    # a future that has to be done before they can go on
+    while True:
+        try:
+            step = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        if isinstance(step, concurrent.futures.Future):
+            concurrent.futures.wait([step])
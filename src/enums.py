@@ -21,3 +21,27 @@ class ParticleEvent(IntEnum):
 
 class LoadingState(Enum):
     THINGY = auto()
+
+
+class DrawLayer(IntEnum):
+    # the order things go on screen in GamePlay.draw, see batch.SpriteBatch
+    INTERACTIVES = auto()
+    FILLED_FURNACES = auto()
+    DOORS = auto()
+    KEYS = auto()
+    PLATFORMS = auto()
+    ROPES = auto()
+    WHEELS = auto()
+    ICE_CUBES = auto()
+    TELEPORTS = auto()
+    DECORATIONS = auto()
+    LOADING_BARS = auto()
+    PARTICLES = auto()
+    TEXT_PARTICLES = auto()
+    ENDPOINT = auto()
+    PLAYER = auto()
+    # after the water
+    POOLS = auto()
+    UI = auto()
+    UI_ICONS = auto()
+    UI_TEXT = auto()
@@ -0,0 +1,113 @@
+import collections
+import string
+
+import pygame
+
+from . import atlas
+
+# text put together from glyphs instead of rendering (and uploading) every string on
+# its own, every glyph gets rendered once per font, colour and antialiasing and ends
+# up on an atlas page, a string is then just where its glyphs go
+
+
+class TextRun:
+    # a string laid out from glyphs, can be drawn (and batched) like a texture,
+    # always at its own size though, nothing draws text rotated or cropped
+    def __init__(
+        self, glyphs: list[tuple[atlas.AtlasRegion, int]], size: tuple[int, int]
+    ):
+        self.glyphs = glyphs
+        self.width, self.height = size
+        self.alpha = 255
+
+    def get_rect(self, **kwargs) -> pygame.Rect:
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        for key, value in kwargs.items():
+            setattr(rect, key, value)
+        return rect
+
+    def draw(self, srcrect=None, dstrect=None, angle=0, flip_x=False) -> None:
+        x, y = (0, 0) if dstrect is None else dstrect[:2]
+        for glyph, offset in self.glyphs:
+            # glyphs are shared with every other string, so the alpha is set each time
+            glyph.alpha = self.alpha
+            glyph.draw(dstrect=(x + offset, y))
+
+
+class GlyphCache:
+    def __init__(
+        self, font: pygame.Font, color="black", aa: bool = False, cache_size: int = 256
+    ):
+        self.font = font
+        self.color = color
+        self.aa = aa
+        self.atlas = atlas.Atlas(page_size=(256, 256))
+        # None for the ones that don't have any pixels (spaces)
+        self.glyphs: dict[str, atlas.AtlasRegion | None] = {}
+        # laid out strings, least recently used first, there's only ever a few
+        # different ones on screen, but numbers and such can keep coming
+        self.cache_size = cache_size
+        self.runs: collections.OrderedDict[str, TextRun] = collections.OrderedDict()
+        # the usual ones up front, so they all end up on the same page
+        self.add_glyphs(string.ascii_letters + string.digits + string.punctuation)
+
+    def add_glyphs(self, chars: str) -> None:
+        for char in chars:
+            surf = self.font.render(char, self.aa, self.color)
+            self.glyphs[char] = (
+                self.atlas.add(surf) if surf.get_bounding_rect() else None
+            )
+
+    def get_glyph(self, char: str) -> atlas.AtlasRegion | None:
+        if char not in self.glyphs:
+            # packed along with anything else new the first time it's drawn
+            self.add_glyphs(char)
+        return self.glyphs[char]
+
+    def layout(self, text: str) -> list[tuple[str, int]]:
+        # where every glyph starts, advances are fractional and there's kerning, so
+        # measuring (not rendering) the string up to each glyph is what lines them
+        # up exactly like font.render would
+        size = self.font.size
+        return [
+            (char, size(text[: i + 1])[0] - size(char)[0])
+            for i, char in enumerate(text)
+        ]
+
+    def render(self, text: str) -> TextRun:
+        run = self.runs.get(text)
+        if run is not None:
+            self.runs.move_to_end(text)
+            return run
+
+        glyphs = []
+        for char, offset in self.layout(text):
+            glyph = self.get_glyph(char)
+            if glyph is not None:
+                glyphs.append((glyph, offset))
+        run = TextRun(glyphs, (self.font.size(text)[0], self.font.get_height()))
+        self.runs[text] = run
+        if len(self.runs) > self.cache_size:
+            self.runs.popitem(last=False)
+        return run
+
+    def render_surface(self, text: str) -> pygame.Surface:
+        # for text that gets blitted onto something else before it's uploaded
+        run = self.render(text)
+        surf = pygame.Surface((run.width, run.height), flags=pygame.SRCALPHA)
+        surf.fblits([(glyph.source, (offset, 0)) for glyph, offset in run.glyphs])
+        return surf
+
+
+# keyed on what the font is rather than the Font object, the same face and size
+# gets opened again after assets let go of it (see assets.FontFace), and would
+# otherwise get a whole new set of glyphs and atlas pages every time
+caches: dict[tuple, GlyphCache] = {}
+
+
+def get(font: pygame.Font, color="black", aa: bool = False) -> GlyphCache:
+    key = (font.name, font.style_name, font.point_size, color, aa)
+    cache = caches.get(key)
+    if cache is None:
+        cache = caches[key] = GlyphCache(font, color, aa)
+    return cache
@@ -0,0 +1,99 @@
+import os
+
+import pygame
+
+from . import common, settings
+
+# stand-ins for the bits of pygame._sdl2 the game uses, so the simulation can run
+# without a window or a GPU (tests, benchmarks, replays on a server, ...),
+# textures only know their size and drawing just counts how often it happened
+
+
+class Window:
+    def __init__(self, title: str = "", size: tuple[int, int] = (640, 480)):
+        self.title = title
+        self.size = size
+
+
+class Renderer:
+    def __init__(self, window: Window | None = None):
+        self.window = window
+        self.target: "Texture | None" = None
+        self.draw_color = pygame.Color(255, 255, 255)
+        self.logical_size = window.size if window is not None else (0, 0)
+        self.draw_calls = 0
+        self.frames = 0
+
+    @property
+    def scale(self) -> tuple[float, float]:
+        # what SDL ends up with for a logical size, letterboxed to fit the window
+        if self.window is None or not all(self.logical_size):
+            return 1.0, 1.0
+        scale = min(
+            self.window.size[0] / self.logical_size[0],
+            self.window.size[1] / self.logical_size[1],
+        )
+        return scale, scale
+
+    def clear(self) -> None:
+        pass
+
+    def fill_rect(self, rect) -> None:
+        self.draw_calls += 1
+
+    def present(self) -> None:
+        self.frames += 1
+
+
+class Texture:
+    def __init__(
+        self,
+        renderer: Renderer,
+        size: tuple[int, int],
+        depth: int = 0,
+        static: bool = False,
+        streaming: bool = False,
+        target: bool = False,
+        scale_quality: int | None = None,
+    ):
+        self.renderer = renderer
+        self.width, self.height = size
+        self.alpha = 255
+        self.blend_mode = pygame.BLENDMODE_BLEND
+        self.color = pygame.Color(255, 255, 255)
+
+    @classmethod
+    def from_surface(cls, renderer: Renderer, surface: pygame.Surface) -> "Texture":
+        return cls(renderer, surface.get_size())
+
+    def get_rect(self, **kwargs) -> pygame.Rect:
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        for key, value in kwargs.items():
+            setattr(rect, key, value)
+        return rect
+
+    def draw(
+        self,
+        srcrect=None,
+        dstrect=None,
+        angle=0,
+        origin=None,
+        flip_x=False,
+        flip_y=False,
+    ) -> None:
+        self.renderer.draw_calls += 1
+
+    def update(self, surface: pygame.Surface, area=None) -> None:
+        pass
+
+
+def init() -> None:
+    # still needs SDL for events, fonts and surfaces, the dummy drivers do for that
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    common.window = Window(title=settings.TITLE, size=settings.WINDOW_SIZE)
+    common.renderer = Renderer(common.window)
+    common.renderer.logical_size = settings.SIZE
+    common.Texture = Texture
+    common.clock = pygame.Clock()
@@ -1,47 +1,72 @@
+import collections
 import dataclasses
+import functools
 import itertools
-import json
 import pathlib
-import queue
-from typing import Iterable
+from typing import Iterable, Sequence
 
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from . import common, animation, assets
+from . import common, animation, assets, atlas, level_cache, masks, settings
 
 MAPS_PATH = pathlib.Path("assets", "maps")
 
 
+# the layers Level turns into TextureTiles, their tile sets go on the atlas up front
+TEXTURE_LAYERS = [
+    "interactives/freezers",
+    "interactives/furnaces",
+    "interactives/filled_furnaces",
+    "interactives/buckets",
+    "lifts/platforms",
+    "lifts/wheels",
+    "transport/teleports",
+    "transport/keys",
+    "transport/doors",
+    "endpoint",
+]
+
+
 class TileSet:
     tiles: list[pygame.Surface]
 
-    def __init__(self, path: str, tile_size: tuple[int, int]):
+    def __init__(
+        self,
+        path: str,
+        tile_size: tuple[int, int],
+        sheet: pygame.Surface | None = None,
+    ):
         # sheet = pygame.image.load(MAPS_PATH / path).convert_alpha()
-        sheet = pygame.image.load(MAPS_PATH / path)
+        if sheet is None:
+            sheet = pygame.image.load(MAPS_PATH / path)
         width, height = tile_size
         self.tiles = [
             sheet.subsurface((0, y, width, height))
             for y in range(0, sheet.get_height(), height)
         ]
         self.tile_size = self.tile_width, self.tile_height = width, height
+        # the GPU side only exists once something needs it, the surfaces are enough
+        # for masks and the static layers
+        self._textures: list[atlas.AtlasRegion] | None = None
 
+    def get_mask(self, tile_idx: int) -> pygame.mask.Mask:
+        # one mask per tile index, shared by every placed tile using it
+        return masks.from_surface(self.tiles[tile_idx])
 
-class TextureTileSet:
-    tiles: list[pg_sdl2.Texture]
+    def add_to_atlas(self, tile_atlas: atlas.Atlas) -> None:
+        # the regions are only usable once tile_atlas is packed
+        if self._textures is None:
+            self._textures = [tile_atlas.add(tile) for tile in self.tiles]
 
-    def __init__(self, path: str, tile_size: tuple[int, int]):
-        # sheet = pygame.image.load(MAPS_PATH / path).convert_alpha()
-        sheet = pygame.image.load(MAPS_PATH / path)
-        width, height = tile_size
-        surf_tiles = [
-            sheet.subsurface((0, y, width, height))
-            for y in range(0, sheet.get_height(), height)
-        ]
-        self.tiles = [
-            pg_sdl2.Texture.from_surface(common.renderer, surf) for surf in surf_tiles
-        ]
-        self.tile_size = self.tile_width, self.tile_height = width, height
+    @property
+    def textures(self) -> list[atlas.AtlasRegion]:
+        if self._textures is None:
+            # nobody asked for these up front, so they get a page of their own
+            tile_atlas = atlas.Atlas()
+            self.add_to_atlas(tile_atlas)
+            tile_atlas.pack()
+        return self._textures
 
 
 class Tile:
@@ -50,12 +75,23 @@ class Tile:
         position: tuple[int, int],
         grid_position: tuple[int, int],
         image: pygame.Surface,
+        tile_set: TileSet | None = None,
+        tile_idx: int = 0,
     ):
         self.position = pygame.Vector2(position)
         self.grid_position = grid_position
         self.image = image
         self.rect = self.image.get_rect(topleft=position)
-        self.mask = pygame.mask.from_surface(image)
+        self.tile_set = tile_set
+        self.tile_idx = tile_idx
+
+    @functools.cached_property
+    def mask(self) -> pygame.mask.Mask:
+        # only the layers something collides with ever get here, the background
+        # ones never need a mask at all
+        if self.tile_set is None:
+            return masks.from_surface(self.image)
+        return self.tile_set.get_mask(self.tile_idx)
 
 
 class TextureTile:
@@ -63,15 +99,13 @@ class TextureTile:
         self,
         position: tuple[int, int],
         grid_position: tuple[int, int],
-        texture: pg_sdl2.Texture,
+        texture: pg_sdl2.Texture | atlas.AtlasRegion,
     ):
         self.position = pygame.Vector2(position)
         self.grid_position = grid_position
         self.image = texture
         self.rect = pygame.FRect(*position, texture.width, texture.height)
-        self.mask = pygame.mask.Mask(
-            self.rect.size, fill=True
-        )  # TODO make it use the actual mask
+        self.mask = masks.of(texture)
 
 
 class WaterTile:
@@ -79,7 +113,7 @@ class WaterTile:
         self,
         position: tuple[int, int],
         grid_position: tuple[int, int],
-        texture: pg_sdl2.Texture,
+        texture: pg_sdl2.Texture | atlas.AtlasRegion,
         idx: int,
     ):
         self.idx = idx
@@ -87,9 +121,7 @@ class WaterTile:
         self.grid_position = grid_position
         self.image = texture
         self.rect = pygame.FRect(*position, texture.width, texture.height)
-        self.mask = pygame.mask.Mask(
-            self.rect.size, fill=True
-        )  # TODO make it use the actual mask
+        self.mask = masks.of(texture)
 
 
 class BigFreezer:
@@ -109,21 +141,31 @@ class BigFreezer:
         self.position = pygame.Vector2(position)
         self.grid_position = grid_position
 
-        self.texture = pg_sdl2.Texture(
+        self.texture = common.Texture(
             common.renderer, (32, 32), target=True
         )  # FIXME don't use hardcoded values...
         self.texture.blend_mode = pygame.BLENDMODE_BLEND
 
         current_target = common.renderer.target
         common.renderer.target = self.texture
+        parts = []
         for i, segment in enumerate(segments):
             y, x = divmod(i, 2)  # hardcoded again :sobbing:
             x *= 16  # yeah...
             y *= 16  # mhm
             segment.image.draw(dstrect=(x, y))
+            parts.append((segment.image, (x, y)))
         common.renderer.target = current_target
 
-        self.mask = pygame.mask.Mask(self.collider_rect.size, fill=True)
+        # the same segments make the same mask, so those get shared too
+        self.mask = masks.composite(
+            tuple(map(int, self.collider_rect.size)),
+            tuple(parts),
+            (
+                int(self.collider_rect.x - self.rect.x),
+                int(self.collider_rect.y - self.rect.y),
+            ),
+        )
 
         self.loading_bar_animation = animation.LoadingBarAnimation(
             assets.images["freezer_loading_bar"], cycle=False
@@ -169,21 +211,30 @@ class LiftPlatform:
         self.position = pygame.Vector2(position)
         self.grid_position = grid_position
 
-        self.texture = pg_sdl2.Texture(
+        self.texture = common.Texture(
             common.renderer, (32, 48), target=True
         )  # FIXME don't use hardcoded values...
         self.texture.blend_mode = pygame.BLENDMODE_BLEND
 
         current_target = common.renderer.target
         common.renderer.target = self.texture
+        parts = []
         for i, segment in enumerate(segments):
             y, x = divmod(i, 2)  # hardcoded again :sobbing:
             x *= 16  # yeah...
             y *= 16  # mhm
             segment.image.draw(dstrect=(x, y))
+            parts.append((segment.image, (x, y)))
         common.renderer.target = current_target
 
-        self.mask = pygame.mask.Mask(self.collider_rect.size, fill=True)
+        self.mask = masks.composite(
+            tuple(map(int, self.collider_rect.size)),
+            tuple(parts),
+            (
+                int(self.collider_rect.x - self.rect.x),
+                int(self.collider_rect.y - self.rect.y),
+            ),
+        )
 
     @property
     def rect(self) -> pygame.FRect:
@@ -219,21 +270,30 @@ class LiftWheel:
         self.position = pygame.Vector2(position)
         self.grid_position = grid_position
 
-        self.texture = pg_sdl2.Texture(
+        self.texture = common.Texture(
             common.renderer, (32, 32), target=True
         )  # FIXME don't use hardcoded values...
         self.texture.blend_mode = pygame.BLENDMODE_BLEND
 
         current_target = common.renderer.target
         common.renderer.target = self.texture
+        parts = []
         for i, segment in enumerate(segments):
             y, x = divmod(i, 2)  # hardcoded again :sobbing:
             x *= 16  # yeah...
             y *= 16  # mhm
             segment.image.draw(dstrect=(x, y))
+            parts.append((segment.image, (x, y)))
         common.renderer.target = current_target
 
-        self.mask = pygame.mask.Mask(self.collider_rect.size, fill=True)
+        self.mask = masks.composite(
+            tuple(map(int, self.collider_rect.size)),
+            tuple(parts),
+            (
+                int(self.collider_rect.x - self.rect.x),
+                int(self.collider_rect.y - self.rect.y),
+            ),
+        )
 
         self.angle = 0
         self.angular_velocity = 0
@@ -278,7 +338,7 @@ class Pool:
         min_x, min_y = min(x for x, _ in segments), min(y for _, y in segments)
         max_x, max_y = max(x for x, _ in segments), max(y for _, y in segments)
 
-        self.texture = pg_sdl2.Texture(
+        self.texture = common.Texture(
             common.renderer,
             (
                 (max_x - min_x + 1) * 16,
@@ -304,6 +364,44 @@ class Pool:
         self.filled_levels = 0
         self.colliders = set(itertools.chain(*self.levels))
 
+    @property
+    def rect(self) -> pygame.FRect:
+        return pygame.FRect(*self.position, self.texture.width, self.texture.height)
+
+    def fill_level(self) -> None:
+        self.filled_levels += 1
+        self.draw_level(self.filled_levels)
+
+    def draw_level(self, filled_levels: int) -> None:
+        water_top, water_body = assets.images["water_top"], assets.images["water_body"]
+        current_target = common.renderer.target
+        common.renderer.target = self.texture
+        water_top.blend_mode = pygame.BLENDMODE_BLEND
+        water_body.blend_mode = pygame.BLENDMODE_BLEND
+        for gx, gy in self.pool_positions[-filled_levels]:
+            (water_body if filled_levels < self.level_count else water_top).draw(
+                dstrect=(gx * 16, gy * 16)
+            )
+        common.renderer.target = current_target
+        water_top.blend_mode = pygame.BLEND_RGBA_MULT
+        water_body.blend_mode = pygame.BLEND_RGBA_MULT
+
+    def set_filled_levels(self, filled_levels: int) -> None:
+        if filled_levels == self.filled_levels:
+            return
+
+        current_target = common.renderer.target
+        current_color = common.renderer.draw_color
+        common.renderer.target = self.texture
+        common.renderer.draw_color = (0, 0, 0, 0)
+        common.renderer.clear()
+        common.renderer.draw_color = current_color
+        common.renderer.target = current_target
+
+        self.filled_levels = 0
+        for _ in range(filled_levels):
+            self.fill_level()
+
 
 class Doors:
     # don't remove this from here, an isinstance check might depend on it
@@ -322,21 +420,30 @@ class Doors:
         self.position = pygame.Vector2(position)
         self.grid_position = grid_position
 
-        self.texture = pg_sdl2.Texture(
+        self.texture = common.Texture(
             common.renderer, (16, 32), target=True
         )  # FIXME don't use hardcoded values...
         self.texture.blend_mode = pygame.BLENDMODE_BLEND
 
         current_target = common.renderer.target
         common.renderer.target = self.texture
+        parts = []
         for i, segment in enumerate(segments):
             y, x = divmod(i, 1)  # hardcoded again :sobbing:
             x *= 16  # yeah...
             y *= 16  # mhm
             segment.image.draw(dstrect=(x, y))
+            parts.append((segment.image, (x, y)))
         common.renderer.target = current_target
 
-        self.mask = pygame.mask.Mask(self.collider_rect.size, fill=True)
+        self.mask = masks.composite(
+            tuple(map(int, self.collider_rect.size)),
+            tuple(parts),
+            (
+                int(self.collider_rect.x - self.rect.x),
+                int(self.collider_rect.y - self.rect.y),
+            ),
+        )
         self.is_locked = True
 
     @property
@@ -356,78 +463,201 @@ class Doors:
         )
 
 
-class Level:
-    tile_texture_layers: list[pg_sdl2.Texture]
+class ChunkedTexture:
+    # a map sized layer cut up into chunks, so nothing has to be as big as the map
+    # (GPUs have texture size limits) and only the chunks on screen get drawn,
+    # chunks without anything in them don't even get a texture
 
-    def __init__(self, name: str, frame: int):
-        self.name = name
-        with open(MAPS_PATH / name / "sprite.json") as file:
-            self.data = json.load(file)
+    def __init__(
+        self,
+        size: tuple[int, int],
+        chunk_size: tuple[int, int],
+        chunks: dict[tuple[int, int], pg_sdl2.Texture],
+    ):
+        self.size = size
+        self.chunk_width, self.chunk_height = self.chunk_size = chunk_size
+        self.chunks = chunks
+        self._blend_mode = pygame.BLENDMODE_BLEND
 
-        self.tile_sets = [
-            TileSet(
-                ts["image"],
-                (ts["grid"]["tileSize"]["width"], ts["grid"]["tileSize"]["height"]),
-            )
-            for ts in self.data["tilesets"]
-        ]
-        self.texture_tile_sets = [
-            TextureTileSet(
-                ts["image"],
-                (ts["grid"]["tileSize"]["width"], ts["grid"]["tileSize"]["height"]),
-            )
-            for ts in self.data["tilesets"]
-        ]
+    @property
+    def blend_mode(self) -> int:
+        return self._blend_mode
+
+    @blend_mode.setter
+    def blend_mode(self, value: int) -> None:
+        self._blend_mode = value
+        for texture in self.chunks.values():
+            texture.blend_mode = value
+
+    def draw_view(self, view: pygame.FRect) -> int:
+        # draws the chunks overlapping the view (in world coordinates) relative to it,
+        # returns how many got drawn
+        drawn = 0
+        chunks = self.chunks
+        for chunk_y in range(
+            max(int(view.top // self.chunk_height), 0),
+            int(view.bottom // self.chunk_height) + 1,
+        ):
+            for chunk_x in range(
+                max(int(view.left // self.chunk_width), 0),
+                int(view.right // self.chunk_width) + 1,
+            ):
+                texture = chunks.get((chunk_x, chunk_y))
+                if texture is None:
+                    continue
+                texture.draw(
+                    dstrect=(
+                        chunk_x * self.chunk_width - view.left,
+                        chunk_y * self.chunk_height - view.top,
+                    )
+                )
+                drawn += 1
+        return drawn
 
-        self.player_position = get_tiles(
-            self.data,
-            "spawn",
-            self.tile_sets[get_layer_by_name(self.data, "spawn")["tileset"]],
-            frame=frame,
-        )
-        assert len(self.player_position) == 1
-        self.player_position = list(self.player_position)[0]
 
-        collider_tile_set = self.tile_sets[
-            get_layer_by_name(self.data, "collisions")["tileset"]
-        ]
-        self.collider_cell_size = collider_tile_set.tile_size
-        self.colliders = get_tiles(self.data, "collisions", collider_tile_set, frame)
-
-        self.background = get_tiles(
-            self.data,
-            "background",
-            self.tile_sets[get_layer_by_name(self.data, "background")["tileset"]],
-            frame,
-        )
+class SpatialIndex:
+    # buckets keys by the (coarse) grid cells their rects touch, so finding what's in
+    # a rect only looks at the cells it covers, not at everything that was added
 
-        self.background_2 = get_tiles(
-            self.data,
-            "background_2",
-            self.tile_sets[get_layer_by_name(self.data, "background_2")["tileset"]],
-            frame,
+    def __init__(self, cell_size: tuple[int, int] = (128, 128)):
+        self.cell_width, self.cell_height = cell_size
+        self.cells: collections.defaultdict[tuple[int, int], list] = (
+            collections.defaultdict(list)
         )
+        self.count = 0
 
-        self.background_3 = get_tiles(
-            self.data,
-            "background_3",
-            self.tile_sets[get_layer_by_name(self.data, "background_3")["tileset"]],
-            frame,
+    def get_cells(self, rect) -> tuple[range, range]:
+        return (
+            range(
+                int(rect.left // self.cell_width),
+                int(rect.right // self.cell_width) + 1,
+            ),
+            range(
+                int(rect.top // self.cell_height),
+                int(rect.bottom // self.cell_height) + 1,
+            ),
         )
 
-        self.water_tiles = get_tiles(
-            self.data,
-            "water",
-            self.tile_sets[get_layer_by_name(self.data, "water")["tileset"]],
-            frame,
-        )
+    def add(self, rect, key) -> None:
+        # the order things were added in is kept, so drawing order doesn't change
+        columns, rows = self.get_cells(rect)
+        for grid_y in rows:
+            for grid_x in columns:
+                self.cells[(grid_x, grid_y)].append((self.count, key))
+        self.count += 1
+
+    def query(self, rect) -> list:
+        found = {}
+        cells = self.cells
+        columns, rows = self.get_cells(rect)
+        for grid_y in rows:
+            for grid_x in columns:
+                items = cells.get((grid_x, grid_y))
+                if items:
+                    found.update(items)
+        return [found[order] for order in sorted(found)]
+
+
+class ProximityIndex:
+    # the things the player can walk up to and use, each one a circle that never
+    # moves, a query only looks at the cells around the player and also says what
+    # came into and went out of range since the last query for the same kind
+
+    def __init__(self, cell_size: tuple[int, int] = (32, 32)):
+        self.index = SpatialIndex(cell_size)
+        self.circles: dict[
+            tuple[str, tuple[int, int]], tuple[pygame.Vector2, float]
+        ] = {}
+        self.in_range: collections.defaultdict[str, set] = collections.defaultdict(set)
+
+    def add(self, kind: str, key: tuple[int, int], center, radius: float) -> None:
+        center = pygame.Vector2(center)
+        rect = pygame.FRect(0, 0, radius * 2, radius * 2)
+        rect.center = center
+        self.index.add(rect, (kind, key))
+        self.circles[(kind, key)] = (center, radius)
+
+    def query(
+        self, kind: str, position, radius: float
+    ) -> tuple[list[tuple[int, int]], list[tuple[int, int]], list[tuple[int, int]]]:
+        # (in range, entered, left), keys come back in the order they were added
+        x, y = position
+        in_range = []
+        for item in self.index.query(
+            pygame.FRect(x - radius, y - radius, radius * 2, radius * 2)
+        ):
+            if item[0] != kind:
+                continue
+            center, item_radius = self.circles[item]
+            if center.distance_squared_to(position) <= (item_radius + radius) ** 2:
+                in_range.append(item[1])
 
-        self.spikes = get_tiles(
-            self.data,
-            "spikes",
-            self.tile_sets[get_layer_by_name(self.data, "spikes")["tileset"]],
-            frame,
-        )
+        previous = self.in_range[kind]
+        current = self.in_range[kind] = set(in_range)
+        entered = [key for key in in_range if key not in previous]
+        left = [key for key in previous if key not in current]
+        return in_range, entered, left
+
+    def clear(self) -> None:
+        # forget what was in range, so everything counts as entering again
+        self.in_range.clear()
+
+
+class Level:
+    static_texture: ChunkedTexture
+
+    def __init__(self, name: str, frame: int, use_cache: bool = True):
+        common.run_steps(self.build(name, frame, use_cache))
+
+    @classmethod
+    def load(cls, name: str, frame: int, use_cache: bool = True):
+        # Level(), but a step at a time, see build
+        new_level = cls.__new__(cls)
+        yield from new_level.build(name, frame, use_cache)
+        return new_level
+
+    def build(self, name: str, frame: int, use_cache: bool = True):
+        # a generator so states.Loading can spread it over a few frames, it yields
+        # roughly how far along it is, or a future when it's waiting on the pool
+        self.name = name
+        pool = assets.get_pool()
+        baking = pool.submit(load_baked, name, frame, use_cache)
+        yield baking
+        baked = self.baked = baking.result()
+        yield 0.1
+
+        decoding = [
+            pool.submit(pygame.image.load, MAPS_PATH / image)
+            for image, _ in baked.tilesets
+        ]
+        for i, sheet in enumerate(decoding):
+            yield sheet
+            yield 0.1 + 0.2 * (i + 1) / len(decoding)
+        self.tile_sets = [
+            TileSet(image, tile_size, sheet.result())
+            for (image, tile_size), sheet in zip(baked.tilesets, decoding)
+        ]
+        # only the tile sets that get drawn as textures are uploaded, and they all
+        # share a few atlas pages
+        self.atlas = atlas.Atlas()
+        for layer_path in TEXTURE_LAYERS:
+            if layer_path in baked.layers:
+                self.get_tile_set(layer_path).add_to_atlas(self.atlas)
+        self.atlas.pack()
+        yield 0.35
+
+        self.player_position = self.get_tile_positions("spawn")
+        assert len(self.player_position) == 1
+        self.player_position = list(self.player_position)[0]
+
+        self.collider_cell_size = self.get_tile_set("collisions").tile_size
+        self.colliders = self.get_tiles("collisions")
+
+        self.background = self.get_tiles("background")
+        self.background_2 = self.get_tiles("background_2")
+        self.background_3 = self.get_tiles("background_3")
+        self.water_tiles = self.get_tiles("water")
+        self.spikes = self.get_tiles("spikes")
 
         self.tile_layers = [
             self.background_3,
@@ -436,91 +666,51 @@ class Level:
             self.colliders,
             self.spikes,
         ]
-        self.map_size = map_size = (self.data["width"], self.data["height"])
-        self.tile_texture_layers = [
-            create_big_texture(map_size, self.background_3.values()),
-            create_big_texture(map_size, self.background_2.values()),
-            create_big_texture(map_size, self.background.values()),
-            create_big_texture(map_size, self.colliders.values()),
-            create_big_texture(map_size, self.spikes.values()),
-        ]
+        self.map_size = baked.map_size
+        yield 0.4
+        # none of these ever change, so they get flattened into one opaque texture
+        # on top of the background colour, one draw per chunk instead of five
+        self.static_texture = yield from self.build_layers_texture(
+            ["background_3", "background_2", "background", "collisions", "spikes"],
+            background=settings.BACKGROUND_COLOR,
+        )
+        yield 0.8
 
-        self.water_texture = create_big_texture(map_size, self.water_tiles.values())
+        self.water_texture = yield from self.build_layers_texture(["water"])
+        yield 0.85
         self.water_texture.blend_mode = pygame.BLEND_RGBA_MULT
-        self.water = get_tile_positions(
-            self.data,
-            "water",
-            self.tile_sets[get_layer_by_name(self.data, "water")["tileset"]],
-            frame,
-        )
+        self.water = self.get_tile_positions("water")
         self.spikes = {grid_pos: [tile] for grid_pos, tile in self.spikes.items()}
 
-        interactives_layer = get_layer_by_name(self.data, "interactives")
         freezers = "freezers"
-        self.freezers = get_texture_tiles(
-            interactives_layer,
-            freezers,
-            self.texture_tile_sets[
-                get_layer_by_name(interactives_layer, freezers)["tileset"]
-            ],
-            frame,
-        )
+        self.freezers = self.get_texture_tiles("interactives/freezers")
 
         self.big_freezers = {}
-        seen = set()
-        current = []
-        for (x, y), tile in self.freezers.items():
-            if (x, y) in seen:
-                continue
-            for x_off, y_off in [(0, 0), (1, 0), (0, 1), (1, 1)]:
-                new_x, new_y = x + x_off, y + y_off
-                seen.add((new_x, new_y))
-
-                tile = self.freezers[(new_x, new_y)]
-                current.append(tile)
+        for x, y in baked.groups["interactives/freezers"]:
             big_freezer = BigFreezer(
-                (x * 16, y * 16), (x, y), current
+                (x * 16, y * 16),
+                (x, y),
+                self.get_segments(
+                    self.freezers,
+                    (x, y),
+                    level_cache.GROUPED_LAYERS["interactives/freezers"],
+                ),
             )  # FIXME don't use hardcoded tile size values...
             self.big_freezers[(x, y)] = big_freezer
-            current.clear()
 
         for freezer in self.big_freezers.values():
             freezer.is_freezing_water = False
-            freezer.spawned_prompt = False
 
         furnaces = "furnaces"
-        self.furnaces = get_texture_tiles(
-            interactives_layer,
-            furnaces,
-            self.texture_tile_sets[
-                get_layer_by_name(interactives_layer, furnaces)["tileset"]
-            ],
-            frame,
-        )
+        self.furnaces = self.get_texture_tiles("interactives/furnaces")
         for furnace in self.furnaces.values():
             furnace.is_filled = False
-            furnace.spawned_prompt = False
             furnace.bucket = None
 
-        filled_furnaces = "filled_furnaces"
-        self.filled_furnaces = get_texture_tiles(
-            interactives_layer,
-            filled_furnaces,
-            self.texture_tile_sets[
-                get_layer_by_name(interactives_layer, filled_furnaces)["tileset"]
-            ],
-            frame,
-        )
+        self.filled_furnaces = self.get_texture_tiles("interactives/filled_furnaces")
 
         buckets = "buckets"
-        self.buckets = get_texture_tiles(
-            interactives_layer,
-            buckets,
-            self.texture_tile_sets[
-                get_layer_by_name(interactives_layer, buckets)["tileset"]
-            ],
-            frame,
-        )
+        self.buckets = self.get_texture_tiles("interactives/buckets")
 
         self.interactives = {
             freezers: self.freezers,
@@ -531,75 +721,35 @@ class Level:
         for interactive in self.interactives.values():
             self.interactives_grid_positions |= interactive.keys()
 
-        lifts_layer = get_layer_by_name(self.data, "lifts")
-        platforms = "platforms"
         self.lift_platforms = {}
-        lift_platform_segments = get_texture_tiles(
-            lifts_layer,
-            platforms,
-            self.texture_tile_sets[
-                get_layer_by_name(lifts_layer, platforms)["tileset"]
-            ],
-            frame,
-        )
-        seen = set()
-        current = []
-        for (x, y), tile in lift_platform_segments.items():
-            if (x, y) in seen:
-                continue
-            for x_off, y_off in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)]:
-                new_x, new_y = x + x_off, y + y_off
-                seen.add((new_x, new_y))
-
-                tile = lift_platform_segments[(new_x, new_y)]
-                current.append(tile)
+        lift_platform_segments = self.get_texture_tiles("lifts/platforms")
+        for x, y in baked.groups["lifts/platforms"]:
             lift_platform = LiftPlatform(
-                (x * 16, y * 16), (x, y), current
+                (x * 16, y * 16),
+                (x, y),
+                self.get_segments(
+                    lift_platform_segments,
+                    (x, y),
+                    level_cache.GROUPED_LAYERS["lifts/platforms"],
+                ),
             )  # FIXME don't use hardcoded tile size values...
             self.lift_platforms[(x, y)] = lift_platform
-            current.clear()
 
-        wheels = "wheels"
         self.lift_wheels = {}
-        lift_wheel_segments = get_texture_tiles(
-            lifts_layer,
-            wheels,
-            self.texture_tile_sets[get_layer_by_name(lifts_layer, wheels)["tileset"]],
-            frame,
-        )
-        seen = set()
-        current = []
-        for (x, y), tile in lift_wheel_segments.items():
-            if (x, y) in seen:
-                continue
-            for x_off, y_off in [(0, 0), (1, 0), (0, 1), (1, 1)]:
-                new_x, new_y = x + x_off, y + y_off
-                seen.add((new_x, new_y))
-
-                tile = lift_wheel_segments[(new_x, new_y)]
-                current.append(tile)
+        lift_wheel_segments = self.get_texture_tiles("lifts/wheels")
+        for x, y in baked.groups["lifts/wheels"]:
             lift_wheel = LiftWheel(
-                (x * 16, y * 16), (x, y), current
+                (x * 16, y * 16),
+                (x, y),
+                self.get_segments(
+                    lift_wheel_segments,
+                    (x, y),
+                    level_cache.GROUPED_LAYERS["lifts/wheels"],
+                ),
             )  # FIXME don't use hardcoded tile size values...
             self.lift_wheels[(x, y)] = lift_wheel
-            current.clear()
-
-        joiners = "joiners"
-        lift_joiner_segments = get_tile_positions(
-            lifts_layer,
-            joiners,
-            self.texture_tile_sets[get_layer_by_name(lifts_layer, joiners)["tileset"]],
-            frame,
-        )
-        seen = set()
-        for x, y in lift_joiner_segments:
-            if (x, y) in seen:
-                continue
-            # print(x, y)
-            (endpoint_1, endpoint_2), traversed = find_end_nodes_from_path_segment(
-                (x, y), lift_joiner_segments
-            )
-            seen.update(traversed)
+
+        for endpoint_1, endpoint_2, traversed in baked.joiners["lifts/joiners"]:
             try:
                 if endpoint_1 in self.lift_wheels:
                     wheel = self.lift_wheels[endpoint_1]
@@ -620,29 +770,11 @@ class Level:
                 min(tpl[1] for tpl in traversed) + 1
             ) * self.collider_cell_size[1]
 
-        pools_layer = get_layer_by_name(self.data, "pools")
-        pool_nodes = get_tile_positions(
-            pools_layer,
-            "top",
-            self.texture_tile_sets[
-                get_layer_by_name(lifts_layer, platforms)["tileset"]
-            ],
-            frame,
-        ) | get_tile_positions(
-            pools_layer,
-            "body",
-            self.texture_tile_sets[
-                get_layer_by_name(lifts_layer, platforms)["tileset"]
-            ],
-            frame,
-        )
+        yield 0.9
 
         self.pools = {}
-        seen = set()
-        for x, y in pool_nodes:
-            if (x, y) in seen:
-                continue
-            nodes = find_all_connected_nodes((x, y), pool_nodes)
+        for nodes in baked.pools:
+            nodes = set(map(tuple, nodes))
             grid_x, grid_y = min(x for x, _ in nodes), min(y for _, y in nodes)
             self.pools[(grid_x, grid_y)] = Pool(
                 (
@@ -652,74 +784,24 @@ class Level:
                 (grid_x, grid_y),
                 nodes,
             )
-            seen.update(nodes)
-
-        transport_layer = get_layer_by_name(self.data, "transport")
-        teleports = "teleports"
-        self.teleports = get_texture_tiles(
-            transport_layer,
-            teleports,
-            self.texture_tile_sets[
-                get_layer_by_name(transport_layer, teleports)["tileset"]
-            ],
-            frame,
-        )
 
-        keys = "keys"
-        self.keys = get_texture_tiles(
-            transport_layer,
-            keys,
-            self.texture_tile_sets[get_layer_by_name(transport_layer, keys)["tileset"]],
-            frame,
-        )
+        self.teleports = self.get_texture_tiles("transport/teleports")
+        self.keys = self.get_texture_tiles("transport/keys")
 
-        doors = "doors"
         self.doors = {}
-        door_segments = get_texture_tiles(
-            transport_layer,
-            doors,
-            self.texture_tile_sets[
-                get_layer_by_name(transport_layer, doors)["tileset"]
-            ],
-            frame,
-        )
-        seen = set()
-        current = []
-        for (x, y), tile in door_segments.items():
-            if (x, y) in seen:
-                continue
-            for x_off, y_off in [(0, 0), (0, 1)]:
-                new_x, new_y = x + x_off, y + y_off
-                seen.add((new_x, new_y))
-
-                tile = door_segments[(new_x, new_y)]
-                current.append(tile)
+        door_segments = self.get_texture_tiles("transport/doors")
+        for x, y in baked.groups["transport/doors"]:
             doors = Doors(
-                (x * 16, y * 16), (x, y), current
+                (x * 16, y * 16),
+                (x, y),
+                self.get_segments(
+                    door_segments, (x, y), level_cache.GROUPED_LAYERS["transport/doors"]
+                ),
             )  # FIXME don't use hardcoded tile size values...
             self.doors[(x, y)] = doors
-            current.clear()
-
-        for door in self.doors.values():
-            door.spawned_prompt = False
-
-        for joiner in ["door_teleport_joiners_1"]:
-            door_teleport_joiner_segments = get_tile_positions(
-                transport_layer,
-                joiner,
-                self.texture_tile_sets[
-                    get_layer_by_name(transport_layer, joiner)["tileset"]
-                ],
-                frame,
-            )
-            seen = set()
-            for x, y in door_teleport_joiner_segments:
-                if (x, y) in seen:
-                    continue
-                (endpoint_1, endpoint_2), traversed = find_end_nodes_from_path_segment(
-                    (x, y), door_teleport_joiner_segments
-                )
-                seen.update(traversed)
+
+        for joiner in ["transport/door_teleport_joiners_1"]:
+            for endpoint_1, endpoint_2, _ in baked.joiners[joiner]:
                 try:
                     if endpoint_1 in self.doors:
                         door = self.doors[endpoint_1]
@@ -737,23 +819,8 @@ class Level:
 
         assert all(hasattr(door, "teleport") for door in self.doors.values())
 
-        for joiner in ["door_key_joiners_1", "door_key_joiners_2"]:
-            door_key_joiner_segments = get_tile_positions(
-                transport_layer,
-                joiner,
-                self.texture_tile_sets[
-                    get_layer_by_name(transport_layer, joiner)["tileset"]
-                ],
-                frame,
-            )
-            seen = set()
-            for x, y in door_key_joiner_segments:
-                if (x, y) in seen:
-                    continue
-                (endpoint_1, endpoint_2), traversed = find_end_nodes_from_path_segment(
-                    (x, y), door_key_joiner_segments
-                )
-                seen.update(traversed)
+        for joiner in ["transport/door_key_joiners_1", "transport/door_key_joiners_2"]:
+            for endpoint_1, endpoint_2, _ in baked.joiners[joiner]:
                 try:
                     if endpoint_1 in self.doors:
                         door = self.doors[endpoint_1]
@@ -774,84 +841,344 @@ class Level:
             for door in self.doors.values()
         )
 
-        self.endpoint = get_texture_tiles(
-            self.data,
-            "endpoint",
-            self.texture_tile_sets[get_layer_by_name(self.data, "endpoint")["tileset"]],
-            frame,
-        )
+        self.endpoint = self.get_texture_tiles("endpoint")
         self.endpoint = {key: [value] for key, value in self.endpoint.items()}
         assert len(self.endpoint) == 1
 
+        yield 0.95
+
+        # for only drawing what's on screen, has (name, grid position) of everything
+        # below, lift platforms move around too much for this, there's only a few anyway
+        self.draw_index = SpatialIndex()
+        for name, dct, bobbing in [
+            ("freezers", self.freezers, False),
+            ("furnaces", self.furnaces, False),
+            ("buckets", self.buckets, True),
+            ("filled_furnaces", self.filled_furnaces, False),
+            ("doors", self.doors, False),
+            ("keys", self.keys, True),
+            ("teleports", self.teleports, False),
+            ("pools", self.pools, False),
+            ("endpoint", {pos: tile for pos, (tile,) in self.endpoint.items()}, False),
+        ]:
+            for pos, item in dct.items():
+                # buckets and keys bob up and down a bit
+                rect = item.rect.inflate(0, 16) if bobbing else item.rect
+                self.draw_index.add(rect, (name, pos))
+
+        # what's close enough to the player to pick up or press E on, the radii are
+        # the interactable's side, GamePlay queries with the player's
+        self.proximity_index = ProximityIndex()
+        for pos, door in self.doors.items():
+            self.proximity_index.add("doors", pos, door.rect.center, 16)
+        for pos, furnace in self.furnaces.items():
+            self.proximity_index.add("furnaces", pos, furnace.rect.center, 10)
+        for pos, freezer in self.big_freezers.items():
+            self.proximity_index.add("freezers", pos, freezer.rect.center, 18)
+        for pos, bucket in self.buckets.items():
+            self.proximity_index.add("buckets", pos, bucket.position + (8, 8), 8)
+        for pos, key in self.keys.items():
+            self.proximity_index.add("keys", pos, key.position + (8, 8), 8)
+
+        self.initial_snapshot = self.snapshot()
+
+    def snapshot(self) -> dict:
+        # only the stuff that changes while playing, everything else is never touched
+        return {
+            "water": self.water.copy(),
+            "buckets": {pos: (b, b.rect.copy()) for pos, b in self.buckets.items()},
+            "keys": {pos: (k, k.rect.copy()) for pos, k in self.keys.items()},
+            "pools": {pos: pool.filled_levels for pos, pool in self.pools.items()},
+            "doors": {
+                pos: (door.is_locked, door.texture) for pos, door in self.doors.items()
+            },
+            "furnaces": {
+                pos: (furnace.is_filled, furnace.bucket)
+                for pos, furnace in self.furnaces.items()
+            },
+            "freezers": {
+                pos: (freezer.is_freezing_water, freezer.bucket)
+                for pos, freezer in self.big_freezers.items()
+            },
+            "lift_wheels": {
+                pos: (
+                    wheel.angle,
+                    wheel.angular_velocity,
+                    wheel.platform.position.copy(),
+                    wheel.platform_initial_position.copy(),
+                )
+                for pos, wheel in self.lift_wheels.items()
+            },
+        }
 
-def find_all_connected_nodes(start: tuple[int, int], all_nodes: set[tuple[int, int]]):
-    all_traversed = {start}
-    traversing = queue.Queue()
-    traversing.put(start)
-    while not traversing.empty():
-        x, y = traversing.get()
-        for x_dir, y_dir in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-            new_xy = x + x_dir, y + y_dir
-            if new_xy in all_traversed or new_xy not in all_nodes:
-                continue
+    def restore(self, snapshot: dict) -> None:
+        # the dicts are shared with other places (e.g. self.interactives),
+        # so they're updated in place instead of being replaced
+        self.water.clear()
+        self.water.update(snapshot["water"])
+        self.proximity_index.clear()
+
+        for dct, saved in [
+            (self.buckets, snapshot["buckets"]),
+            (self.keys, snapshot["keys"]),
+        ]:
+            dct.clear()
+            for pos, (item, rect) in saved.items():
+                item.rect = rect.copy()
+                dct[pos] = item
+
+        for pos, filled_levels in snapshot["pools"].items():
+            self.pools[pos].set_filled_levels(filled_levels)
+
+        for pos, (is_locked, texture) in snapshot["doors"].items():
+            door = self.doors[pos]
+            door.is_locked = is_locked
+            door.texture = texture
+
+        for pos, (is_filled, bucket) in snapshot["furnaces"].items():
+            furnace = self.furnaces[pos]
+            furnace.is_filled = is_filled
+            furnace.bucket = bucket
+
+        for pos, (is_freezing_water, bucket) in snapshot["freezers"].items():
+            freezer = self.big_freezers[pos]
+            freezer.is_freezing_water = is_freezing_water
+            freezer.bucket = bucket
+            freezer.loading_bar_image = None
+            freezer.loading_bar_animation.reset()
+
+        for pos, (
+            angle,
+            angular_velocity,
+            platform_position,
+            initial_position,
+        ) in snapshot["lift_wheels"].items():
+            wheel = self.lift_wheels[pos]
+            wheel.angle = angle
+            wheel.angular_velocity = angular_velocity
+            wheel.platform.position = platform_position.copy()
+            wheel.platform_initial_position = initial_position.copy()
+
+    def reset(self) -> None:
+        self.restore(self.initial_snapshot)
+
+    def get_tile_set(self, layer_path: str) -> "TileSet":
+        return self.tile_sets[self.baked.layers[layer_path][0]]
+
+    def get_tile_positions(self, layer_path: str) -> set[tuple[int, int]]:
+        tile_set_idx, tile_map = self.baked.layers[layer_path]
+        return make_tile_positions(tile_map, self.tile_sets[tile_set_idx].tile_size)
+
+    def get_tiles(self, layer_path: str) -> dict[tuple[int, int], "Tile"]:
+        tile_set_idx, tile_map = self.baked.layers[layer_path]
+        return make_tiles(tile_map, self.tile_sets[tile_set_idx], layer_path)
+
+    def get_texture_tiles(
+        self, layer_path: str
+    ) -> dict[tuple[int, int], "TextureTile"]:
+        tile_set_idx, tile_map = self.baked.layers[layer_path]
+        return make_texture_tiles(tile_map, self.tile_sets[tile_set_idx])
+
+    def build_layers_texture(
+        self,
+        layer_paths: list[str],
+        background: pygame.Color | tuple[int, int, int] | None = None,
+    ):
+        # yields after every chunk, returns the ChunkedTexture
+        layers = []
+        for layer_path in layer_paths:
+            tile_set_idx, tile_map = self.baked.layers[layer_path]
+            layers.append((tile_map, self.tile_sets[tile_set_idx]))
+        return (
+            yield from build_chunked_tile_map_texture(
+                self.map_size, layers, background=background
+            )
+        )
 
-            all_traversed.add(new_xy)
-            traversing.put(new_xy)
+    @staticmethod
+    def get_segments(
+        segments: dict[tuple[int, int], "TextureTile"],
+        grid_position: tuple[int, int],
+        offsets: list[tuple[int, int]],
+    ) -> list["TextureTile"]:
+        x, y = grid_position
+        return [segments[(x + x_off, y + y_off)] for x_off, y_off in offsets]
 
-    return all_traversed
 
+# levels are expensive to build, so they're built once and reset instead
+levels: dict[tuple[str, int], Level] = {}
 
-def find_end_nodes_from_path_segment(
-    start: tuple[int, int], segments: set[tuple[int, int]], came_from=(0, 0)
-):
-    # this whole thing is super janky
-    x, y = start
-    found_segments = set()
-    all_segments = {start}
-    going_other_direction = False
-    i = 0
-    for x_dir, y_dir in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-        if (-x_dir, -y_dir) == came_from:
-            continue
 
-        if len(found_segments) == 1 and came_from != (0, 0):
-            if not going_other_direction:
-                continue
-            else:
-                going_other_direction = True
+def load_level(name: str, frame: int):
+    # get_level, a step at a time (see Level.build)
+    if (name, frame) not in levels:
+        levels[(name, frame)] = yield from Level.load(name, frame)
+    return levels[(name, frame)]
 
-        new_start = x + x_dir, y + y_dir
-        if new_start not in segments:
-            continue
 
-        i += 1
-        segment, traversed = find_end_nodes_from_path_segment(
-            new_start, segments, (x_dir, y_dir)
-        )
-        all_segments.update(traversed)
-        found_segments.update(segment)
+def get_level(name: str, frame: int) -> Level:
+    return common.run_steps(load_level(name, frame))
+
 
-    if i == 0:
-        found_segments.add(start)
-    elif i == 1 and came_from == (0, 0):
-        found_segments.add(start)
-    # print(found_segments)
-    return found_segments, all_segments
+def load_baked(name: str, frame: int, use_cache: bool = True) -> level_cache.BakedLevel:
+    baked = level_cache.load(name, frame) if use_cache else None
+    if baked is None:
+        baked = level_cache.bake(name, frame, write=use_cache)
+    return baked
 
 
-def create_big_texture(size: tuple[int, int], tiles: Iterable[Tile]) -> pg_sdl2.Texture:
-    surf = pygame.Surface(size, flags=pygame.SRCALPHA)
-    surf.fblits([(tile.image, tile.rect) for tile in tiles])
-    texture = pg_sdl2.Texture.from_surface(common.renderer, surf)
+def find_segment_groups(
+    segments: Iterable[tuple[int, int]], offsets: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    # segments have to be iterated top left to bottom right
+    groups = []
+    seen = set()
+    for x, y in sorted(segments, key=lambda xy: (xy[1], xy[0])):
+        if (x, y) in seen:
+            continue
+        for x_off, y_off in offsets:
+            seen.add((x + x_off, y + y_off))
+        groups.append((x, y))
+    return groups
+
+
+class GridGraph:
+    # grid positions and which of their 4 neighbours are also in it, built once and
+    # then walked with a stack, so a joiner can be as long as it wants without
+    # running into the recursion limit
+    def __init__(self, nodes: Iterable[tuple[int, int]]):
+        self.nodes = nodes if isinstance(nodes, set) else set(nodes)
+        self.adjacency: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for x, y in self.nodes:
+            self.adjacency[(x, y)] = [
+                (x + x_dir, y + y_dir)
+                for x_dir, y_dir in [(0, -1), (1, 0), (0, 1), (-1, 0)]
+                if (x + x_dir, y + y_dir) in self.nodes
+            ]
+
+    def components(self) -> list[list[tuple[int, int]]]:
+        components = []
+        seen = set()
+        for start in self.nodes:
+            if start in seen:
+                continue
+            seen.add(start)
+            component = [start]
+            stack = [start]
+            while stack:
+                for neighbour in self.adjacency[stack.pop()]:
+                    if neighbour in seen:
+                        continue
+                    seen.add(neighbour)
+                    component.append(neighbour)
+                    stack.append(neighbour)
+            components.append(component)
+        return components
+
+    def paths(
+        self,
+    ) -> tuple[
+        list[tuple[tuple[int, int], tuple[int, int], list[tuple[int, int]]]],
+        list[tuple[int, int]],
+    ]:
+        # every component should be a line with exactly two ends, the ones that
+        # aren't (single tiles, loops, forks) come back as their top left node so
+        # they can all be reported at once instead of one per run
+        paths = []
+        broken = []
+        for component in self.components():
+            ends = []
+            for node in component:
+                degree = len(self.adjacency[node])
+                if degree == 1:
+                    ends.append(node)
+                elif degree != 2:
+                    ends = None
+                    break
+            if ends is None or len(ends) != 2:
+                broken.append(min(component, key=lambda xy: (xy[1], xy[0])))
+                continue
+            endpoint_1, endpoint_2 = sorted(ends)
+            paths.append((endpoint_1, endpoint_2, component))
+        return paths, broken
+
+
+def build_chunked_tile_map_texture(
+    size: tuple[int, int],
+    layers: list[
+        tuple[tuple[tuple[int, int], tuple[int, int], Sequence[int]], TileSet]
+    ],
+    chunk_size: tuple[int, int] = (256, 256),
+    background: pygame.Color | tuple[int, int, int] | None = None,
+):
+    # yields after every chunk upload, run it with common.run_steps to just get it,
+    # layers are (tile map, tile set) pairs, drawn on top of each other in order,
+    # with a background colour the result is opaque and every chunk gets made
+    chunk_width, chunk_height = chunk_size
+    map_width, map_height = size
+
+    blits = collections.defaultdict(list)
+    if background is not None:
+        for chunk_y in range(-(-map_height // chunk_height)):
+            for chunk_x in range(-(-map_width // chunk_width)):
+                blits[(chunk_x, chunk_y)] = []
+
+    for tile_map, tile_set in layers:
+        (x_off, y_off), (columns, rows), tiles = tile_map
+        width, height = tile_set.tile_size
+        for i, tile_idx in enumerate(tiles):
+            if tile_idx == 0 or tile_idx >= len(tile_set.tiles):
+                continue
+            row, col = divmod(i, columns)
+            x, y = x_off + col * width, y_off + row * height
+            # a tile can stick out into the neighbouring chunks
+            for chunk_y in range(
+                y // chunk_height, (y + height - 1) // chunk_height + 1
+            ):
+                for chunk_x in range(
+                    x // chunk_width, (x + width - 1) // chunk_width + 1
+                ):
+                    blits[(chunk_x, chunk_y)].append(
+                        (
+                            tile_set.tiles[tile_idx],
+                            (x - chunk_x * chunk_width, y - chunk_y * chunk_height),
+                        )
+                    )
+
+    chunks = {}
+    for (chunk_x, chunk_y), chunk_blits in blits.items():
+        left, top = chunk_x * chunk_width, chunk_y * chunk_height
+        if not (0 <= left < map_width and 0 <= top < map_height):
+            continue
+        chunk_surf_size = (
+            min(chunk_width, map_width - left),
+            min(chunk_height, map_height - top),
+        )
+        if background is not None:
+            surf = pygame.Surface(chunk_surf_size)
+            surf.fill(background)
+        else:
+            surf = pygame.Surface(chunk_surf_size, flags=pygame.SRCALPHA)
+        surf.fblits(chunk_blits)
+        if background is None and not surf.get_bounding_rect():
+            # the tiles were fully transparent, not worth a texture
+            continue
+        chunks[(chunk_x, chunk_y)] = common.Texture.from_surface(common.renderer, surf)
+        yield
+
+    texture = ChunkedTexture(size, chunk_size, chunks)
+    if background is not None:
+        texture.blend_mode = pygame.BLENDMODE_NONE
     return texture
 
 
-def get_tile_positions(
-    data: dict, layer_name: str, tile_set: TileSet | TextureTileSet, frame: int
+def make_tile_positions(
+    tile_map: tuple[tuple[int, int], tuple[int, int], Sequence[int]],
+    tile_size: tuple[int, int],
 ) -> set[tuple[int, int]]:
     grid_positions = set()
-    (x_off, y_off), (columns, rows), tiles = get_tile_map(data, layer_name, frame)
-    width, height = tile_set.tile_width, tile_set.tile_height
+    (x_off, y_off), (columns, rows), tiles = tile_map
+    width, height = tile_size
 
     col_off = x_off // width
     row_off = y_off // height
@@ -870,17 +1197,17 @@ def get_tile_positions(
     return grid_positions
 
 
-def get_tiles(
-    data: dict, layer_name: str, tile_set: TileSet, frame: int
+def make_tiles(
+    tile_map: tuple[tuple[int, int], tuple[int, int], Sequence[int]],
+    tile_set: TileSet,
+    layer_name: str = "",
 ) -> dict[tuple[int, int], Tile]:
     grid_map = {}
-    (x_off, y_off), (columns, rows), tiles = get_tile_map(data, layer_name, frame)
+    (x_off, y_off), (columns, rows), tiles = tile_map
     width, height = tile_set.tile_width, tile_set.tile_height
 
     col_off = x_off // width
     row_off = y_off // height
-    # print(layer_name)
-    # print(tiles)
 
     for i, tile_idx in enumerate(tiles):
         # skip empty tiles
@@ -892,33 +1219,27 @@ def get_tiles(
         grid_y = row_off + row
         x = x_off + col * width
         y = y_off + row * height
-        # print(grid_x, grid_y)
-        # if layer_name != "water":
 
         try:
             grid_map[(grid_x, grid_y)] = Tile(
                 position=(x, y),
                 grid_position=(grid_x, grid_y),
                 image=tile_set.tiles[tile_idx],
+                tile_set=tile_set,
+                tile_idx=tile_idx,
             )
         except IndexError as e:
             print(e, (grid_x, grid_y), layer_name)
-        # else:
-        #     grid_map[(grid_x, grid_y)] = WaterTile(
-        #         position=(x, y),
-        #         grid_position=(grid_x, grid_y),
-        #         image=tile_set.tiles[tile_idx],
-        #         idx=tile_idx,
-        #     )
 
     return grid_map
 
 
-def get_texture_tiles(
-    data: dict, layer_name: str, tile_set: TextureTileSet, frame: int
+def make_texture_tiles(
+    tile_map: tuple[tuple[int, int], tuple[int, int], Sequence[int]],
+    tile_set: TileSet,
 ) -> dict[tuple[int, int], TextureTile]:
     grid_map = {}
-    (x_off, y_off), (columns, rows), tiles = get_tile_map(data, layer_name, frame)
+    (x_off, y_off), (columns, rows), tiles = tile_map
     width, height = tile_set.tile_width, tile_set.tile_height
 
     col_off = x_off // width
@@ -938,7 +1259,7 @@ def get_texture_tiles(
         grid_map[(grid_x, grid_y)] = TextureTile(
             position=(x, y),
             grid_position=(grid_x, grid_y),
-            texture=tile_set.tiles[tile_idx],
+            texture=tile_set.textures[tile_idx],
         )
 
     return grid_map
@@ -0,0 +1,218 @@
+import array
+import dataclasses
+import hashlib
+import json
+import marshal
+import struct
+import sys
+import zlib
+
+from . import level
+
+# bump this whenever the payload layout (or anything that goes into it) changes
+FORMAT_VERSION = 1
+MAGIC = b"IHWL"
+HEADER = struct.Struct("<4sH32s")
+
+TILE_LAYERS = [
+    "spawn",
+    "collisions",
+    "background",
+    "background_2",
+    "background_3",
+    "water",
+    "spikes",
+    "endpoint",
+    "interactives/freezers",
+    "interactives/furnaces",
+    "interactives/filled_furnaces",
+    "interactives/buckets",
+    "lifts/platforms",
+    "lifts/wheels",
+    "lifts/joiners",
+    "pools/top",
+    "pools/body",
+    "transport/teleports",
+    "transport/keys",
+    "transport/doors",
+    "transport/door_teleport_joiners_1",
+    "transport/door_key_joiners_1",
+    "transport/door_key_joiners_2",
+]
+
+# layer -> offsets (in grid cells) of the segments making up one object, top left first
+GROUPED_LAYERS = {
+    "interactives/freezers": [(0, 0), (1, 0), (0, 1), (1, 1)],
+    "lifts/platforms": [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)],
+    "lifts/wheels": [(0, 0), (1, 0), (0, 1), (1, 1)],
+    "transport/doors": [(0, 0), (0, 1)],
+}
+
+JOINER_LAYERS = [
+    "lifts/joiners",
+    "transport/door_teleport_joiners_1",
+    "transport/door_key_joiners_1",
+    "transport/door_key_joiners_2",
+]
+
+TileMap = tuple[tuple[int, int], tuple[int, int], array.array]
+
+
+@dataclasses.dataclass
+class BakedLevel:
+    map_size: tuple[int, int]
+    tilesets: list[tuple[str, tuple[int, int]]]
+    # layer path -> (tileset index, tile map)
+    layers: dict[str, tuple[int, TileMap]]
+    # layer path -> top left grid positions of every multi-tile object
+    groups: dict[str, list[tuple[int, int]]]
+    pools: list[list[tuple[int, int]]]
+    # layer path -> (endpoint_1, endpoint_2, traversed) for every joiner
+    joiners: dict[str, list[tuple[tuple[int, int], tuple[int, int], list]]]
+
+
+def cache_path(name: str, frame: int):
+    return level.MAPS_PATH / name / f"frame_{frame}.bake"
+
+
+def source_digest(name: str, frame: int) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(struct.pack("<HHi", FORMAT_VERSION, marshal.version, frame))
+    digest.update(sys.implementation.cache_tag.encode())
+
+    map_dir = level.MAPS_PATH / name
+    for path in [map_dir / "sprite.json", *sorted(map_dir.glob("*.png"))]:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def load(name: str, frame: int) -> BakedLevel | None:
+    try:
+        with open(cache_path(name, frame), "rb") as file:
+            magic, version, digest = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            if digest != source_digest(name, frame):
+                return None
+            payload = marshal.loads(zlib.decompress(file.read()))
+    except (OSError, struct.error, zlib.error, ValueError, EOFError, TypeError):
+        return None
+
+    return decode(payload)
+
+
+def save(name: str, frame: int, baked: BakedLevel) -> None:
+    data = zlib.compress(marshal.dumps(encode(baked)))
+    digest = source_digest(name, frame)
+    with open(cache_path(name, frame), "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, digest))
+        file.write(data)
+
+
+def bake(name: str, frame: int, write: bool = True) -> BakedLevel:
+    with open(level.MAPS_PATH / name / "sprite.json") as file:
+        data = json.load(file)
+
+    tilesets = [
+        (
+            ts["image"],
+            (ts["grid"]["tileSize"]["width"], ts["grid"]["tileSize"]["height"]),
+        )
+        for ts in data["tilesets"]
+    ]
+
+    layers = {}
+    for layer_path in TILE_LAYERS:
+        parent = data
+        *parents, layer_name = layer_path.split("/")
+        for parent_name in parents:
+            parent = level.get_layer_by_name(parent, parent_name)
+        tileset = level.get_layer_by_name(parent, layer_name)["tileset"]
+        offset, size, tiles = level.get_tile_map(parent, layer_name, frame)
+        layers[layer_path] = (tileset, (offset, size, array.array("I", tiles)))
+
+    tile_sizes = {path: tilesets[idx][1] for path, (idx, _) in layers.items()}
+
+    groups = {
+        layer_path: level.find_segment_groups(
+            level.make_tile_positions(layers[layer_path][1], tile_sizes[layer_path]),
+            offsets,
+        )
+        for layer_path, offsets in GROUPED_LAYERS.items()
+    }
+
+    pool_nodes = level.make_tile_positions(
+        layers["pools/top"][1], tile_sizes["pools/top"]
+    ) | level.make_tile_positions(layers["pools/body"][1], tile_sizes["pools/body"])
+    pools = [sorted(nodes) for nodes in level.GridGraph(pool_nodes).components()]
+
+    joiners = {}
+    broken = []
+    for layer_path in JOINER_LAYERS:
+        segments = level.make_tile_positions(
+            layers[layer_path][1], tile_sizes[layer_path]
+        )
+        paths, broken_paths = level.GridGraph(segments).paths()
+        joiners[layer_path] = [
+            (endpoint_1, endpoint_2, sorted(traversed))
+            for endpoint_1, endpoint_2, traversed in paths
+        ]
+        broken.extend(f"{layer_path} at {x}, {y}" for x, y in broken_paths)
+    if broken:
+        raise Exception(
+            "joiners have to be lines with exactly two ends, these aren't: "
+            + "; ".join(broken)
+        )
+
+    baked = BakedLevel(
+        map_size=(data["width"], data["height"]),
+        tilesets=tilesets,
+        layers=layers,
+        groups=groups,
+        pools=pools,
+        joiners=joiners,
+    )
+    if write:
+        try:
+            save(name, frame, baked)
+        except OSError as e:
+            print(f"couldn't write level cache for {name!r}: {e}")
+    return baked
+
+
+def encode(baked: BakedLevel) -> dict:
+    return {
+        "map_size": baked.map_size,
+        "tilesets": baked.tilesets,
+        "layers": {
+            layer_path: (tileset, (offset, size, tiles.tobytes()))
+            for layer_path, (tileset, (offset, size, tiles)) in baked.layers.items()
+        },
+        "groups": baked.groups,
+        "pools": baked.pools,
+        "joiners": baked.joiners,
+    }
+
+
+def decode(payload: dict) -> BakedLevel:
+    layers = {}
+    for layer_path, (tileset, (offset, size, tiles)) in payload["layers"].items():
+        tile_array = array.array("I")
+        tile_array.frombytes(tiles)
+        layers[layer_path] = (tileset, (offset, size, tile_array))
+
+    return BakedLevel(
+        map_size=payload["map_size"],
+        tilesets=payload["tilesets"],
+        layers=layers,
+        groups=payload["groups"],
+        pools=payload["pools"],
+        joiners=payload["joiners"],
+    )
+
+
+if __name__ == "__main__":
+    for map_name in sys.argv[1:] or ["map_1", "map_2"]:
+        bake(map_name, 0)
+        print(f"baked {map_name!r} -> {cache_path(map_name, 0)}")
@@ -1,21 +1,71 @@
+import argparse
+import atexit
 import itertools
+import random
+import time
 
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from . import common, settings, assets, states
-
-pygame.init()
-# common.screen = screen = pygame.display.set_mode(
-#     (settings.WIDTH, settings.HEIGHT), flags=settings.DISPLAY_FLAGS
-# )
-
-common.window = window = pygame.Window(title=settings.TITLE, size=settings.WINDOW_SIZE)
-common.renderer = renderer = pg_sdl2.Renderer(window)
-renderer.logical_size = settings.SIZE
-common.clock = clock = pygame.Clock()
+from . import common, settings, assets, states, headless, replay
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--headless", action="store_true", help="run without a window or a GPU renderer"
+)
+parser.add_argument("--record", metavar="FILE", help="record the inputs to FILE")
+parser.add_argument("--replay", metavar="FILE", help="play back the inputs from FILE")
+parser.add_argument(
+    "--fast",
+    action="store_true",
+    help="don't wait for real time, one simulation step per frame, as fast as possible",
+)
+parser.add_argument(
+    "--timings", metavar="FILE", help="write how long every frame took (in ms) to FILE"
+)
+args = parser.parse_args()
+
+if args.headless:
+    headless.init()
+else:
+    pygame.init()
+    # common.screen = screen = pygame.display.set_mode(
+    #     (settings.WIDTH, settings.HEIGHT), flags=settings.DISPLAY_FLAGS
+    # )
 
-assets.load_assets()
+    common.window = pygame.Window(title=settings.TITLE, size=settings.WINDOW_SIZE)
+    common.renderer = pg_sdl2.Renderer(common.window)
+    common.renderer.logical_size = settings.SIZE
+    common.clock = pygame.Clock()
+window, renderer, clock = common.window, common.renderer, common.clock
+
+recorder = None
+playback = None
+if args.replay:
+    playback = replay.Replay(args.replay)
+    seed = playback.seed
+    settings.TICK_RATE = playback.tick_rate
+else:
+    seed = random.randrange(2**32)
+random.seed(seed)
+if args.record:
+    recorder = replay.Recorder(args.record, seed, settings.TICK_RATE)
+timings = []
+
+
+def finish():
+    # atexit, since the exit button in the menu just calls sys.exit()
+    if recorder is not None:
+        recorder.save()
+        print(f"recorded {len(recorder.ticks)} ticks to {args.record!r} (seed {seed})")
+    if playback is not None:
+        replay.print_timings(timings)
+    if args.timings:
+        with open(args.timings, "w") as file:
+            file.writelines(f"{timing * 1000:.3f}\n" for timing in timings)
+
+
+atexit.register(finish)
 
 # common.set_current_state(states.GamePlay())
 common.set_current_state(states.MainMenu())
@@ -36,23 +86,33 @@ pygame.mixer.music.set_volume(0.1)
 
 # prev_sfx_volume = common.sfx_volume
 
+# fixed timestep, the simulation always advances by exactly common.dt, rendering
+# happens at whatever rate it can and interpolates in between
+common.dt = step = 1 / settings.TICK_RATE
+accumulator = 0.0
+# events that came in on frames without a simulation step, so they don't get lost
+pending_events = []
+tick_count = 0
+
 running = True
 while running:
-    dt = clock.tick(settings.FPS) / 1000
-    common.dt = dt = pygame.math.clamp(dt, 0.0005, 0.05)
+    if args.fast:
+        clock.tick()
+        accumulator = step
+    else:
+        accumulator += clock.tick(settings.FPS) / 1000
+    frame_start = time.perf_counter()
     window.title = f"{settings.TITLE} | FPS: {clock.get_fps():.0f}"
 
     renderer.draw_color = (0, 0, 0)
     renderer.clear()
 
     events = pygame.event.get()
+    pending_events.extend(events)
     common.events = events
     for event in events:
         if event.type == pygame.QUIT:
             running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                common.set_current_state(states.MainMenu())
 
     for event in common.events:
         if event.type == MUSIC_ENDED:
@@ -78,7 +138,52 @@ while running:
     # screen.blit(title, title.get_rect(center=(settings.WIDTH // 2, settings.HEIGHT // 2 - 20)))
     # title.draw(dstrect=title_rect)
 
-    common.get_current_state().update()
+    steps = 0
+    while (
+        accumulator >= step
+        and steps < settings.MAX_STEPS_PER_FRAME
+        and not isinstance(common.get_current_state(), states.Loading)
+    ):
+        if playback is not None:
+            if playback.finished:
+                running = False
+                break
+            # whatever happens live is ignored, apart from quitting
+            common.events, common.keys, common.mouse_pos = playback.next_tick()
+        else:
+            # only the first step of a frame gets the events, the rest are catching up
+            common.events, pending_events = pending_events, []
+            common.keys = pygame.key.get_pressed()
+            common.mouse_pos = pygame.mouse.get_pos()
+        if recorder is not None:
+            recorder.record(common.events, common.keys, common.mouse_pos)
+
+        tick_count += 1
+        common.ticks = tick_count * 1000 // settings.TICK_RATE
+
+        for event in common.events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                common.set_current_state(states.MainMenu())
+
+        common.get_current_state().update()
+        accumulator -= step
+        steps += 1
+    if not running:
+        # the replay ran out (or the window got closed) mid frame, nothing to draw
+        break
+    if isinstance(common.get_current_state(), states.Loading):
+        # loading isn't part of the simulation, it takes however long it takes on
+        # this machine, so it gets a go every frame instead of using up ticks (and
+        # a replay's inputs), whatever was pressed meanwhile is dropped
+        common.get_current_state().update()
+        accumulator = 0.0
+        pending_events.clear()
+    if steps == settings.MAX_STEPS_PER_FRAME:
+        # too far behind, drop the backlog instead of spiralling
+        accumulator = min(accumulator, step)
+
+    common.alpha = accumulator / step
     common.get_current_state().draw()
 
     renderer.present()
+    timings.append(time.perf_counter() - frame_start)
@@ -0,0 +1,74 @@
+import functools
+import weakref
+
+import pygame
+
+# masks are only ever read, never changed, so everything that looks the same can
+# share one, tiles, texture tiles and the bigger level objects all get theirs here,
+# they're kept by the surface they come from (weakly), so once an asset or level
+# lets go of its surfaces the masks go too
+
+_surface_masks: weakref.WeakKeyDictionary[pygame.Surface, pygame.mask.Mask] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class _CompositeNode:
+    # one level per part that has a surface, so nothing here holds on to any of them
+    def __init__(self):
+        self.children = weakref.WeakKeyDictionary()
+        self.masks = {}
+
+
+_composites = _CompositeNode()
+
+
+@functools.cache
+def filled(size: tuple[int, int]) -> pygame.mask.Mask:
+    return pygame.mask.Mask(size, fill=True)
+
+
+def from_surface(surface: pygame.Surface) -> pygame.mask.Mask:
+    mask = _surface_masks.get(surface)
+    if mask is None:
+        mask = _surface_masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+
+def of(image) -> pygame.mask.Mask:
+    # atlas regions remember the surface they came from, plain textures can't be
+    # read back, so those are just their whole rect
+    source = getattr(image, "source", None)
+    if source is None:
+        return filled((image.width, image.height))
+    return from_surface(source)
+
+
+def composite(
+    size: tuple[int, int],
+    parts: tuple[tuple, ...],
+    offset: tuple[int, int] = (0, 0),
+) -> pygame.mask.Mask:
+    # parts are (image, position) like the segments drawn onto a level object's
+    # texture, offset is where the mask starts on that texture
+    node = _composites
+    layout = []
+    for image, position in parts:
+        source = getattr(image, "source", None)
+        if source is None:
+            layout.append((position, (image.width, image.height)))
+            continue
+        layout.append((position, None))
+        child = node.children.get(source)
+        if child is None:
+            child = node.children[source] = _CompositeNode()
+        node = child
+    key = (size, tuple(layout), offset)
+
+    mask = node.masks.get(key)
+    if mask is None:
+        mask = node.masks[key] = pygame.mask.Mask(size)
+        offset_x, offset_y = offset
+        for image, (x, y) in parts:
+            mask.draw(of(image), (x - offset_x, y - offset_y))
+    return mask
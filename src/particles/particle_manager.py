@@ -1,13 +1,19 @@
+import collections
 import itertools
 
+import numpy as np
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from .particles import Particle
-from src import animation, common, spritesheet
+from src import animation, common, enums, glyphs, spritesheet
 
 
 class ParticleManager:
+    # particles live in parallel arrays (structure of arrays), the first `count`
+    # rows are the live ones, so updating is a handful of numpy operations
+    # no matter how many particles there are
+    INITIAL_CAPACITY = 64
+
     def __init__(
         self,
         sprite_sheet: list[dict[str, int | pg_sdl2.Texture]]
@@ -17,46 +23,151 @@ class ParticleManager:
             data = sprite_sheet.data[""]
         else:
             data = sprite_sheet
-        durations = [0] + [d["duration"] for d in data]
-        ranges = [
-            range(t1, t2)
-            for t1, t2 in itertools.pairwise(itertools.accumulate(durations))
-        ]
-        self.max_time = ranges[-1].stop
-        self.mapping = {
-            i: image
-            for range_, image in zip(ranges, (d["image"] for d in data))
-            for i in range_
-        }
-        self.particles = []
+        # frame i is shown from frame_ends[i - 1] (or 0) up to frame_ends[i],
+        # so a particle's frame is just a binary search on its time
+        self.frames = [d["image"] for d in data]
+        # frames can also just be the same texture drawn with a different alpha
+        if any("alpha" in d for d in data):
+            self.frame_alphas = [d.get("alpha", 255) for d in data]
+        else:
+            self.frame_alphas = None
+        self.frame_ends = np.array(
+            list(itertools.accumulate(d["duration"] for d in data)), dtype=np.int64
+        )
+        self.max_time = int(self.frame_ends[-1])
+        self.max_frame_size = max(
+            max(frame.width, frame.height) for frame in self.frames
+        )
+        self.count = 0
+        self.positions = np.zeros((self.INITIAL_CAPACITY, 2))
+        self.velocities = np.zeros((self.INITIAL_CAPACITY, 2))
+        self.times = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.max_times = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, capacity: int):
+        for name in ["positions", "velocities", "times", "max_times"]:
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
 
     def spawn(self, pos, velocity, count=1, max_time=None):
-        for _ in range(count):
-            self.particles.append(
-                Particle(pos=pos, velocity=velocity, time=0, max_time=max_time)
-            )
+        start, end = self.count, self.count + count
+        if end > len(self.times):
+            self.grow(max(end, len(self.times) * 2))
+        if max_time is None:
+            max_time = self.max_time
+        if count == 1:
+            # the usual case, numpy is a lot quicker with plain scalars than with
+            # a vector it first has to turn into an array
+            x, y = pos
+            vx, vy = velocity
+            self.positions[start, 0] = x
+            self.positions[start, 1] = y
+            self.velocities[start, 0] = vx
+            self.velocities[start, 1] = vy
+        else:
+            self.positions[start:end] = tuple(pos)
+            self.velocities[start:end] = tuple(velocity)
+        self.times[start:end] = 0
+        self.max_times[start:end] = max_time
+        self.count = end
+
+    def clear(self):
+        self.count = 0
 
     def update(self):
-        for particle in self.particles:
-            particle.time += int(common.dt * 1000)
-            particle.pos += particle.velocity * common.dt
-        self.particles = [
-            p
-            for p in self.particles
-            if p.time < (p.max_time if p.max_time is not None else self.max_time)
-        ]
-
-    def render(self, camera: pygame.Vector2, target=None, static=False):
-        for particle in self.particles:
-            texture = self.mapping[particle.time]
-            img = texture
-            rect = pygame.FRect(0, 0, texture.width, texture.height).move_to(
-                center=particle.pos
-            )
-            if static:
-                img.draw(dstrect=rect)
-            else:
-                img.draw(dstrect=rect.topleft - camera)
+        n = self.count
+        if not n:
+            return
+        self.times[:n] += int(common.dt * 1000)
+        self.positions[:n] += self.velocities[:n] * common.dt
+
+        dead = np.flatnonzero(self.times[:n] >= self.max_times[:n])
+        if not len(dead):
+            return
+        # swap remove, the live particles from the end fill the holes
+        # the dead ones leave behind (order doesn't matter for particles)
+        new_count = n - len(dead)
+        holes = dead[dead < new_count]
+        fillers = np.flatnonzero(self.times[new_count:n] < self.max_times[new_count:n])
+        fillers += new_count
+        for array in [self.positions, self.velocities, self.times, self.max_times]:
+            array[holes] = array[fillers]
+        self.count = new_count
+
+    def any_within(self, center, radius: float) -> bool:
+        # is there any particle (its center) at most `radius` away from `center`
+        n = self.count
+        if not n:
+            return False
+        offsets = self.positions[:n] - center
+        return bool(np.any(offsets[:, 0] ** 2 + offsets[:, 1] ** 2 <= radius**2))
+
+    def render(
+        self,
+        camera: pygame.Vector2,
+        target=None,
+        static=False,
+        batch=None,
+        layer: int = enums.DrawLayer.PARTICLES,
+    ) -> int:
+        # returns how many particles actually got drawn (or went into the batch)
+        n = self.count
+        if not n:
+            return 0
+        # particles move in a straight line, so stepping back from the latest
+        # simulation step gives the exact in between position
+        rewind = common.dt * (1 - common.alpha)
+        positions = self.positions[:n] - self.velocities[:n] * rewind
+        if not static:
+            positions -= camera
+
+        # skip the ones that are off screen
+        width, height = common.renderer.logical_size
+        margin = self.max_frame_size
+        on_screen = np.flatnonzero(
+            (positions[:, 0] > -margin)
+            & (positions[:, 0] < width + margin)
+            & (positions[:, 1] > -margin)
+            & (positions[:, 1] < height + margin)
+        )
+        positions = positions[on_screen]
+
+        frame_indices = np.searchsorted(
+            self.frame_ends, self.times[on_screen], side="right"
+        )
+        # a max_time longer than the animation just holds the last frame
+        np.minimum(frame_indices, len(self.frames) - 1, out=frame_indices)
+        frames = self.frames
+        alphas = self.frame_alphas
+        if batch is not None:
+            # the camera is already taken care of above, so screen space
+            for (x, y), index in zip(positions.tolist(), frame_indices.tolist()):
+                texture = frames[index]
+                width, height = texture.width, texture.height
+                batch.draw(
+                    texture,
+                    (x - width / 2, y - height / 2),
+                    layer,
+                    alpha=None if alphas is None else alphas[index],
+                    screen=True,
+                )
+            return len(on_screen)
+        for (x, y), index in zip(positions.tolist(), frame_indices.tolist()):
+            texture = frames[index]
+            if alphas is not None:
+                # frames are shared regions and glyph runs, same as in batch.flush
+                previous_alpha = texture.alpha
+                texture.alpha = alphas[index]
+            width, height = texture.width, texture.height
+            texture.draw(dstrect=(x - width / 2, y - height / 2, width, height))
+            if alphas is not None:
+                texture.alpha = previous_alpha
+        return len(on_screen)
 
     @classmethod
     def from_string(
@@ -80,14 +191,12 @@ class ParticleManager:
         else:
             alpha = [alpha] * count
 
-        image = font.render(text, aa, color)
+        # the same text for all the frames, the alpha gets set when drawing
+        texture = glyphs.get(font, color, aa).render(text)
 
         sheet = []
         for d, a in zip(delay, alpha):
-            img = image.copy()
-            img.set_alpha(a)
-            img = pg_sdl2.Texture.from_surface(common.renderer, img)
-            dct = {"image": img, "duration": d}
+            dct = {"image": texture, "duration": d, "alpha": a}
             sheet.append(dct)
 
         return cls(sheet)
@@ -102,6 +211,7 @@ class TextParticleManager:
         alpha=255,
         color: str = "black",
         aa: bool = True,
+        cache_size: int = 32,
     ):
         self.font = font
         self.count = count
@@ -109,10 +219,17 @@ class TextParticleManager:
         self.alpha = alpha
         self.color = color
         self.aa = aa
-        self.particle_managers = {}
+        # one manager per distinct text, least recently spawned first, once there
+        # are more than cache_size of them the ones without live particles get
+        # dropped (their text is just shared glyphs, see glyphs.py)
+        self.cache_size = cache_size
+        self.particle_managers: collections.OrderedDict[str, ParticleManager] = (
+            collections.OrderedDict()
+        )
 
     def spawn(self, text: str, pos, velocity, count=1, max_time=None):
-        if text not in self.particle_managers:
+        manager = self.particle_managers.get(text)
+        if manager is None:
             manager = ParticleManager.from_string(
                 font=self.font,
                 text=text,
@@ -123,12 +240,44 @@ class TextParticleManager:
                 aa=self.aa,
             )
             self.particle_managers[text] = manager
-        self.particle_managers[text].spawn(pos, velocity, count, max_time=max_time)
+            manager.spawn(pos, velocity, count, max_time=max_time)
+            # after spawning, so the new one doesn't look unused
+            self.evict()
+        else:
+            self.particle_managers.move_to_end(text)
+            manager.spawn(pos, velocity, count, max_time=max_time)
+
+    def evict(self):
+        for text, manager in list(self.particle_managers.items()):
+            if len(self.particle_managers) <= self.cache_size:
+                break
+            if manager:
+                # still has particles on screen
+                continue
+            del self.particle_managers[text]
+
+    def clear(self):
+        for manager in self.particle_managers.values():
+            manager.clear()
+
+    def __len__(self):
+        return sum(len(manager) for manager in self.particle_managers.values())
 
     def update(self):
         for manager in self.particle_managers.values():
-            manager.update()
+            if manager:
+                manager.update()
 
-    def render(self, camera: pygame.Vector2, target=None, static=False):
+    def render(
+        self,
+        camera: pygame.Vector2,
+        target=None,
+        static=False,
+        batch=None,
+        layer: int = enums.DrawLayer.TEXT_PARTICLES,
+    ) -> int:
+        drawn = 0
         for manager in self.particle_managers.values():
-            manager.render(camera, target, static)
+            if manager:
+                drawn += manager.render(camera, target, static, batch, layer)
+        return drawn
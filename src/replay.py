@@ -0,0 +1,130 @@
+import gzip
+import json
+import statistics
+
+import pygame
+
+# a recording is everything the simulation reads from the outside world, per tick:
+# the events, the pressed keys and the mouse position, plus the seed `random` starts
+# from, feeding that back in gives the exact same play session every time
+
+FORMAT_VERSION = 1
+
+INPUT_EVENTS = {
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEWHEEL,
+}
+
+
+def should_record(event: pygame.Event) -> bool:
+    # timers (particle spawns and such) fire in real time, so they're inputs too
+    return event.type in INPUT_EVENTS or event.type >= pygame.USEREVENT
+
+
+def encode_event(event: pygame.Event) -> list:
+    attributes = {}
+    for key, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)):
+            attributes[key] = value
+        elif isinstance(value, tuple):
+            attributes[key] = list(value)
+        # anything else (e.g. the window the event came from) can't be replayed anyway
+    return [event.type, attributes]
+
+
+def decode_event(data: list) -> pygame.Event:
+    event_type, attributes = data
+    for key, value in attributes.items():
+        if isinstance(value, list):
+            attributes[key] = tuple(value)
+    return pygame.Event(event_type, attributes)
+
+
+class Recorder:
+    def __init__(self, path: str, seed: int, tick_rate: int):
+        self.path = path
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.ticks = []
+
+    def record(self, events: list[pygame.Event], keys, mouse_pos) -> None:
+        self.ticks.append(
+            [
+                [encode_event(event) for event in events if should_record(event)],
+                # only the pressed scancodes, the rest is a whole lot of False,
+                # the wrapper doesn't allow iterating, the tuple underneath does
+                [
+                    scancode
+                    for scancode, pressed in enumerate(tuple.__iter__(keys))
+                    if pressed
+                ],
+                list(mouse_pos),
+            ]
+        )
+
+    def save(self) -> None:
+        data = {
+            "version": FORMAT_VERSION,
+            "seed": self.seed,
+            "tick_rate": self.tick_rate,
+            "ticks": self.ticks,
+        }
+        with gzip.open(self.path, "wt") as file:
+            json.dump(data, file, separators=(",", ":"))
+
+
+class Replay:
+    def __init__(self, path: str):
+        with gzip.open(path, "rt") as file:
+            data = json.load(file)
+        if data["version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"{path!r} is a version {data['version']} recording, "
+                f"expected version {FORMAT_VERSION}"
+            )
+        self.seed = data["seed"]
+        self.tick_rate = data["tick_rate"]
+        self.ticks = data["ticks"]
+        self.tick = 0
+        self.key_count = len(pygame.key.get_pressed())
+
+    @property
+    def finished(self) -> bool:
+        return self.tick >= len(self.ticks)
+
+    def next_tick(self) -> tuple[list[pygame.Event], pygame.key.ScancodeWrapper, tuple]:
+        events, scancodes, mouse_pos = self.ticks[self.tick]
+        self.tick += 1
+
+        pressed = [False] * self.key_count
+        for scancode in scancodes:
+            pressed[scancode] = True
+        return (
+            [decode_event(event) for event in events],
+            pygame.key.ScancodeWrapper(pressed),
+            tuple(mouse_pos),
+        )
+
+
+def print_timings(timings: list[float]) -> None:
+    # timings are in seconds, one per frame
+    if not timings:
+        return
+    timings = sorted(timings)
+    percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else []
+
+    def percentile(p: int) -> float:
+        return (percentiles[p - 1] if percentiles else timings[0]) * 1000
+
+    print(
+        f"{len(timings)} frames in {sum(timings):.2f} s | "
+        f"mean {statistics.mean(timings) * 1000:.3f} ms | "
+        f"p50 {percentile(50):.3f} ms | "
+        f"p95 {percentile(95):.3f} ms | "
+        f"p99 {percentile(99):.3f} ms | "
+        f"max {timings[-1] * 1000:.3f} ms"
+    )
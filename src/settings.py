@@ -12,6 +12,9 @@ WINDOW_WIDTH: int = 1280
 WINDOW_HEIGHT: int = 720
 WINDOW_SIZE: tuple[int, int] = (WINDOW_WIDTH, WINDOW_HEIGHT)
 
+# shows through wherever the background tiles don't cover the level
+BACKGROUND_COLOR: tuple[int, int, int] = (0, 150, 150)
+
 DISPLAY_FLAGS: int = pygame.SCALED  # TODO add FULLSCREEN setting in the UI
 # DISPLAY_FLAGS: int = 0
 
@@ -20,3 +23,17 @@ FPS: int = 60
 # FPS: int = 30
 # FPS: int = 20
 # FPS: int = 1
+
+# the simulation always steps at this rate, regardless of FPS
+TICK_RATE: int = 60
+# if a frame takes too long, don't try to catch up more than this, the game just
+# slows down instead of falling further and further behind
+MAX_STEPS_PER_FRAME: int = 5
+
+# how long (in seconds) the loading screen gets to spend building the next state
+# every frame, the rest of the frame is for drawing the progress bar
+LOADING_FRAME_BUDGET: float = 1 / 120
+
+# "bfs" searches pixel by pixel for the closest spot that doesn't collide,
+# "swept" resolves each axis in one go and only falls back to "bfs" when it has to
+COLLISION_RESOLVER: str = "bfs"
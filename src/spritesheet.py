@@ -6,26 +6,43 @@ import operator
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from . import common
+from . import common, atlas
+
+
+def decode(sheet_path, config_path=None) -> tuple[pygame.Surface, dict]:
+    # the slow part (reading and decoding), doesn't touch the renderer, so it can run
+    # on another thread
+    sheet_path = pathlib.Path(sheet_path)
+    if config_path is None:
+        config_path = pathlib.Path(sheet_path.parent, f"{sheet_path.stem}.json")
+    with open(config_path) as file:
+        config = json.load(file)
+    # spritesheet = pygame.image.load(sheet_path).convert_alpha()
+    return pygame.image.load(sheet_path), config
 
 
 class AsepriteSpriteSheet:
-    def __init__(self, sheet_path, config_path=None):
-        sheet_path = pathlib.Path(sheet_path)
-        if config_path is None:
-            config_path = pathlib.Path(sheet_path.parent, f"{sheet_path.stem}.json")
-        with open(config_path) as file:
-            config = json.load(file)
+    def __init__(
+        self,
+        sheet_path,
+        config_path=None,
+        sprite_atlas: atlas.Atlas | None = None,
+        decoded: tuple[pygame.Surface, dict] | None = None,
+    ):
+        if decoded is None:
+            decoded = decode(sheet_path, config_path)
+        spritesheet, config = decoded
 
         self._data = collections.defaultdict(list)
 
-        # spritesheet = pygame.image.load(sheet_path).convert_alpha()
-        spritesheet = pygame.image.load(sheet_path)
         for name, data in config["frames"].items():
             key, num = name.rsplit("_", maxsplit=1)
             x, y, w, h = data["frame"].values()
             image = spritesheet.subsurface((x, y, w, h))
-            image = pg_sdl2.Texture.from_surface(common.renderer, image)
+            if sprite_atlas is not None:
+                image = sprite_atlas.add(image)
+            else:
+                image = common.Texture.from_surface(common.renderer, image)
             self._data[key].append(
                 (int(num), {"image": image, "duration": data["duration"]})
             )
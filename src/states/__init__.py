@@ -1,3 +1,4 @@
 from .gameplay import GamePlay
+from .loading import Loading
 from .menus import MainMenu
 from .tutorial import Tutorial
@@ -1,121 +1,61 @@
 import collections
-import collections.abc
 import heapq
 import math
 import random
 import types
-import functools
 
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from src import player, settings, common, enums, animation, assets, level, particles, states
+from src import (
+    batch,
+    player,
+    settings,
+    common,
+    enums,
+    animation,
+    assets,
+    glyphs,
+    level,
+    particles,
+    states,
+    collision,
+)
 
 
 def calculate_initial_velocity(jump_height: float, gravity: float) -> float:
     return -((2 * gravity * jump_height) ** 0.5)
 
 
-def collide_circle(p1, r1, p2, r2):
-    return p1.distance_squared_to(p2) <= (r1 + r2) ** 2
-
-
-@functools.cache
 def get_number_as_texture(
     number: int, font: pygame.Font | None = None
-) -> tuple[pg_sdl2.Texture, pygame.Rect]:
+) -> tuple[glyphs.TextRun, pygame.Rect]:
     if font is None:
         font = assets.fonts["pixelify_semibold"][14]
-    surf = font.render(str(number), False, "black")
-    text = pg_sdl2.Texture.from_surface(common.renderer, surf)
-    return text, surf.get_rect()
-
-
-class CombinedDict:
-    def __init__(self, *dicts):
-        super().__init__()
-        self.dicts = dicts
-
-    def __getitem__(self, item):
-        items = []
-        for dct in self.dicts:
-            if item not in dct:
-                continue
-
-            value = dct[item]
-            if isinstance(value, collections.abc.Iterable):
-                items.extend(value)
-            else:
-                items.append(value)
-
-        return items
-
-    def __contains__(self, item):
-        for dct in self.dicts:
-            if item in dct:
-                return True
-        return False
-
-    def keys(self):
-        for dct in self.dicts:
-            yield from dct.keys()
-
-    def values(self):
-        for dct in self.dicts:
-            for value in dct.values():
-                if not isinstance(value, collections.abc.Iterable):
-                    yield [value]
-                else:
-                    yield value
-
-    def items(self):
-        for dct in self.dicts:
-            yield from dct.items()
+    text = glyphs.get(font, "black").render(str(number))
+    return text, text.get_rect()
 
 
 class GamePlay:
-    def __init__(self):
-        center = (settings.WIDTH / 2, settings.HEIGHT / 2)
+    asset_groups = ("gameplay",)
 
-        self.level = level.Level("map_2", 0)
+    @classmethod
+    def load(cls):
+        # for states.Loading, the level is what takes a while
+        yield from level.load_level("map_2", 0)
+        return cls()
 
-        # pos = (340, 672)
-        pos = (
-            self.level.player_position[0] * 16,
-            (self.level.player_position[1] - 1) * 16,
-        )  # FIXME hardcoded values
-        self.camera = (
-            pygame.Vector2(pos) + (0, 16) - settings.SIZE
-        )  # FIXME more hardcoded values...
+    def __init__(self):
+        self.level = level.get_level("map_2", 0)
 
-        self.player = types.SimpleNamespace(
-            position=pygame.Vector2(pos),
-            velocity=pygame.Vector2(),
-            terminal_y_vel=700,
-            rect=pygame.FRect(0, 0, 16, 32).move_to(center=pos),
-            collision_rect=pygame.FRect(0, 0, 7, 31).move_to(center=pos),
-            mask=pygame.Mask((7, 31), fill=True),
-            walk_speed=60,
-            walk_speed_on_ground=60,
-            jump_height=30,
-            # jump_height=120,
-            animation=animation.EntityAnimation(sprite_sheet=assets.images["player"]),
-            state=enums.EntityState.IDLE,
-            flip=False,
-            is_grounded=False,
-            jump_timer=0,
-            inventory=collections.defaultdict(list),
-            alive=True,
-            in_water=False,
-            active_item=None,
+        self.colliders = collision.CollisionGrid(
+            self.level.collider_cell_size, self.level.colliders
         )
-
-        assets.stop_all_sounds()
-
-        self.extra_colliders = collections.defaultdict(list)
-        self.extra_cleared_colliders = collections.defaultdict(list)
-        self.colliders = CombinedDict(
-            self.level.colliders, self.extra_colliders, self.extra_cleared_colliders
+        self.spike_colliders = collision.CollisionGrid(
+            self.level.collider_cell_size, self.level.spikes
+        )
+        self.endpoint_colliders = collision.CollisionGrid(
+            self.level.collider_cell_size, self.level.endpoint
         )
 
         self.extra_decorations = {}
@@ -158,14 +98,68 @@ class GamePlay:
             self.text_particle_manager,
         ]
 
-        self.ui_layer = pg_sdl2.Texture(common.renderer, settings.SIZE, target=True)
+        self.ui_layer = common.Texture(common.renderer, settings.SIZE, target=True)
+        self.batch = batch.SpriteBatch()
+        # what draw drew and skipped for being off screen, last frame
+        self.drawn_count = self.culled_count = 0
         self.ui_layer.blend_mode = pygame.BLENDMODE_BLEND
 
-        self.was_down = set()
-
         assets.images["water_top"].blend_mode = pygame.BLEND_RGBA_MULT
         assets.images["water_body"].blend_mode = pygame.BLEND_RGBA_MULT
 
+        self.reset()
+
+    def reset(self) -> None:
+        # everything that can change while playing goes back to how it was initially,
+        # the level itself (textures, masks, etc.) is only ever built once
+        center = (settings.WIDTH / 2, settings.HEIGHT / 2)
+
+        self.level.reset()
+
+        # pos = (340, 672)
+        pos = (
+            self.level.player_position[0] * 16,
+            (self.level.player_position[1] - 1) * 16,
+        )  # FIXME hardcoded values
+        self.camera = (
+            pygame.Vector2(pos) + (0, 16) - settings.SIZE
+        )  # FIXME more hardcoded values...
+        self.previous_camera = self.camera.copy()
+
+        self.player = types.SimpleNamespace(
+            position=pygame.Vector2(pos),
+            previous_position=pygame.Vector2(pos),
+            velocity=pygame.Vector2(),
+            terminal_y_vel=700,
+            rect=pygame.FRect(0, 0, 16, 32).move_to(center=pos),
+            collision_rect=pygame.FRect(0, 0, 7, 31).move_to(center=pos),
+            mask=pygame.Mask((7, 31), fill=True),
+            walk_speed=60,
+            walk_speed_on_ground=60,
+            jump_height=30,
+            # jump_height=120,
+            animation=animation.EntityAnimation(sprite_sheet=assets.images["player"]),
+            state=enums.EntityState.IDLE,
+            flip=False,
+            is_grounded=False,
+            jump_timer=0,
+            inventory=collections.defaultdict(list),
+            alive=True,
+            in_water=False,
+            active_item=None,
+        )
+
+        assets.stop_all_sounds()
+
+        self.colliders.clear()
+        self.extra_decorations.clear()
+        self.extra_cleared_decorations.clear()
+
+        for particle_manager in self.particle_managers:
+            particle_manager.clear()
+
+        self.was_down = set()
+
         # self.player.inventory["ice_cubes"].append(assets.images["ice_cube_icon"])
         # self.player.inventory["ice_cubes"].append(assets.images["ice_cube_icon"])
         # self.player.inventory["ice_cubes"].append(assets.images["ice_cube_icon"])
@@ -173,18 +167,21 @@ class GamePlay:
         # self.player.inventory["ice_cubes"].append(assets.images["ice_cube_icon"])
 
     def update(self) -> None:
-        # yikes
         if not self.player.alive:
-            self.__init__()
+            self.reset()
 
-        self.extra_cleared_colliders.clear()
+        # for interpolating in draw
+        self.previous_camera = self.camera.copy()
+        self.player.previous_position = self.player.position.copy()
+
+        self.colliders.clear_frame()
         self.extra_cleared_decorations.clear()
 
         if self.player.active_item is not None:
             if not self.player.inventory[self.player.active_item]:
                 self.player.active_item = None
 
-        keys = pygame.key.get_pressed()
+        keys = common.keys
         gravity = 400
         player_grid_x, player_grid_y = (
             self.player.position.x // 16,
@@ -392,48 +389,52 @@ class GamePlay:
             self.player.velocity.y * common.dt + 0.5 * gravity * common.dt**2
         )
 
+        self.player.previous_collision_rect = self.player.collision_rect.copy()
         self.player.collision_rect.center = self.player.position
 
         for platform in self.level.lift_platforms.values():
             # platform.position.y += -5 * common.dt
             for position in self.get_colliding_cells(platform.collider_rect):
-                self.extra_cleared_colliders[position].append(platform.collider)
+                self.colliders.add_frame(position, platform.collider)
 
-        for door_grid_pos, door in self.level.doors.items():
-            if collide_circle(
-                pygame.Vector2(door.rect.center), 16, self.player.position, 10
-            ):
-                if not door.spawned_prompt:
-                    self.text_particle_manager.spawn(
-                        "PRESS E",
-                        pygame.Vector2(door.rect.midtop) + pygame.Vector2(0, -10),
-                        pygame.Vector2(0, -10),
-                    )
-                door.spawned_prompt = True
-                if e_just_pressed:
-                    if door.is_locked:
-                        if door.key in self.player.inventory["keys"]:
-                            self.player.inventory["keys"].remove(door.key)
-                            door.is_locked = False
-                            door.texture = assets.images["door_open"]
-                        else:
-                            self.text_particle_manager.spawn(
-                                "NO MATCHING KEY",
-                                pygame.Vector2(door.rect.midtop)
-                                + pygame.Vector2(0, -10),
-                                pygame.Vector2(0, -10),
-                            )
+        near_doors, entered, _ = self.level.proximity_index.query(
+            "doors", self.player.position, 10
+        )
+        for door_grid_pos in entered:
+            door = self.level.doors[door_grid_pos]
+            self.text_particle_manager.spawn(
+                "PRESS E",
+                pygame.Vector2(door.rect.midtop) + pygame.Vector2(0, -10),
+                pygame.Vector2(0, -10),
+            )
+        if e_just_pressed:
+            for door_grid_pos in near_doors:
+                door = self.level.doors[door_grid_pos]
+                if door.is_locked:
+                    if door.key in self.player.inventory["keys"]:
+                        self.player.inventory["keys"].remove(door.key)
+                        door.is_locked = False
+                        door.texture = assets.images["door_open"]
                     else:
-                        self.player.collision_rect.centerx = door.teleport.rect.centerx
-                        self.player.collision_rect.centery = door.teleport.rect.top - 10
-            else:
-                door.spawned_prompt = False
+                        self.text_particle_manager.spawn(
+                            "NO MATCHING KEY",
+                            pygame.Vector2(door.rect.midtop) + pygame.Vector2(0, -10),
+                            pygame.Vector2(0, -10),
+                        )
+                else:
+                    self.player.collision_rect.centerx = door.teleport.rect.centerx
+                    self.player.collision_rect.centery = door.teleport.rect.top - 10
+                    # nothing to sweep through when teleporting
+                    self.player.previous_collision_rect = (
+                        self.player.collision_rect.copy()
+                    )
+        for door_grid_pos, door in self.level.doors.items():
             if door.is_locked:
-                self.extra_cleared_colliders[door_grid_pos].append(door.collider)
+                self.colliders.add_frame(door_grid_pos, door.collider)
 
         self.handle_collisions()
-        if self.mask_collides_any_with_colliders(
-            self.level.spikes, self.player.collision_rect, self.player.mask
+        if self.spike_colliders.mask_collides_any(
+            self.player.collision_rect, self.player.mask
         ):
             self.player.alive = False
 
@@ -451,9 +452,7 @@ class GamePlay:
         ):
             self.player.alive = False
 
-        mouse_pos = (
-            pygame.Vector2(pygame.mouse.get_pos()).elementwise() / common.renderer.scale
-        )
+        mouse_pos = pygame.Vector2(common.mouse_pos).elementwise() / common.renderer.scale
         mouse_world_pos = self.camera + mouse_pos
         m_gx, m_gy = mouse_grid_pos = (
             mouse_world_pos.elementwise() // self.level.collider_cell_size
@@ -484,29 +483,25 @@ class GamePlay:
             cube_collides_with_player = self.player.collision_rect.colliderect(
                 cube_tile.rect
             )
-            cube_overlaps_collider = (cube_gx, cube_gy) in self.colliders and any(
-                cube_tile.rect.colliderect(collider.rect)
-                for collider in self.colliders[(cube_gx, cube_gy)]
+            cube_overlaps_collider = self.colliders.rect_collides(
+                (cube_gx, cube_gy), cube_tile.rect
             )
             cube_overlaps_interactive = (
                 cube_gx,
                 cube_gy,
             ) in self.level.interactives_grid_positions
-            cube_mid_air = True
-            if (cube_gx, cube_gy + 1) in self.colliders:
-                cube_mid_air = not any(
-                    cube_tile.rect.move(0, 1).colliderect(collider.rect)
-                    for collider in self.colliders[(cube_gx, cube_gy + 1)]
-                )
+            cube_mid_air = not self.colliders.rect_collides(
+                (cube_gx, cube_gy + 1), cube_tile.rect.move(0, 1)
+            )
             if (
                 cube_mid_air
                 and (cube_gx, cube_gy + 1) in self.level.interactives_grid_positions
             ):
                 cube_mid_air = False
-            cube_on_lift_platform = any(
-                isinstance(collider, level.LiftPlatform.Collider)
-                and cube_tile.rect.move(0, 1).colliderect(collider.rect)
-                for collider in self.colliders[(cube_gx, cube_gy + 1)]
+            cube_on_lift_platform = self.colliders.rect_collides(
+                (cube_gx, cube_gy + 1),
+                cube_tile.rect.move(0, 1),
+                kind=level.LiftPlatform.Collider,
             )
             cube_in_water = (cube_gx, cube_gy) in self.level.water
             cube_overlaps_spike = (cube_gx, cube_gy) in self.level.spikes
@@ -534,7 +529,7 @@ class GamePlay:
                         if cube_invalid_location:
                             continue
                         assets.sfx["knock"].play()
-                        self.extra_colliders[(cube_gx, cube_gy)].append(cube_tile)
+                        self.colliders.add((cube_gx, cube_gy), cube_tile)
                         self.player.inventory["ice_cubes"].pop()
 
         if self.player.inventory["buckets"] and self.player.active_item == "buckets":
@@ -597,59 +592,41 @@ class GamePlay:
                                 )
                             continue
                         assets.sfx["splash"].play()
-                        pool.filled_levels += 1
+                        pool.fill_level()
                         self.level.water.update(pool.levels[-pool.filled_levels])
-
-                        current_target = common.renderer.target
-                        common.renderer.target = pool.texture
-                        assets.images["water_top"].blend_mode = pygame.BLENDMODE_BLEND
-                        assets.images["water_body"].blend_mode = pygame.BLENDMODE_BLEND
-                        for gx, gy in pool.pool_positions[-pool.filled_levels]:
-                            assets.images[
-                                "water_body"
-                                if pool.filled_levels < pool.level_count
-                                else "water_top"
-                            ].draw(dstrect=(gx * 16, gy * 16))
-                        common.renderer.target = current_target
-                        assets.images["water_top"].blend_mode = pygame.BLEND_RGBA_MULT
-                        assets.images["water_body"].blend_mode = pygame.BLEND_RGBA_MULT
                         for _ in range(len(pool.levels[-pool.filled_levels])):
                             self.player.inventory["buckets"].pop()
 
-        if self.mask_collides_any_with_colliders(
-            self.level.endpoint, self.player.rect, self.player.mask
+        if self.endpoint_colliders.mask_collides_any(
+            self.player.rect, self.player.mask
         ):
             common.set_current_state(states.MainMenu())
 
-        for furnace in self.level.furnaces.values():
-            if collide_circle(
-                pygame.Vector2(furnace.rect.center), 10, self.player.position, 10
-            ):
-                if e_just_pressed:
-                    if self.player.inventory["buckets"] and furnace.bucket is None:
-                        assets.sfx["splash"].play()
-                        furnace.is_filled = True
-                        furnace.bucket = self.player.inventory["buckets"].pop()
-                    elif furnace.bucket is not None:
-                        assets.sfx["pop"].play()
-                        furnace.is_filled = False
-                        self.player.inventory["buckets"].append(furnace.bucket)
-                        furnace.bucket = None
-                if not furnace.spawned_prompt:
-                    self.text_particle_manager.spawn(
-                        "PRESS E",
-                        pygame.Vector2(furnace.rect.midtop) + pygame.Vector2(0, -26),
-                        pygame.Vector2(0, -10),
-                    )
-                furnace.spawned_prompt = True
-            else:
-                furnace.spawned_prompt = False
+        near_furnaces, entered, _ = self.level.proximity_index.query(
+            "furnaces", self.player.position, 10
+        )
+        for furnace_grid_pos in near_furnaces:
+            furnace = self.level.furnaces[furnace_grid_pos]
+            if e_just_pressed:
+                if self.player.inventory["buckets"] and furnace.bucket is None:
+                    assets.sfx["splash"].play()
+                    furnace.is_filled = True
+                    furnace.bucket = self.player.inventory["buckets"].pop()
+                elif furnace.bucket is not None:
+                    assets.sfx["pop"].play()
+                    furnace.is_filled = False
+                    self.player.inventory["buckets"].append(furnace.bucket)
+                    furnace.bucket = None
+            if furnace_grid_pos in entered:
+                self.text_particle_manager.spawn(
+                    "PRESS E",
+                    pygame.Vector2(furnace.rect.midtop) + pygame.Vector2(0, -26),
+                    pygame.Vector2(0, -10),
+                )
 
         for wheel in self.level.lift_wheels.values():
-            if any(
-                collide_circle(pygame.Vector2(wheel.rect.center), 8, p.pos, 3)
-                for p in self.furnace_particles.particles
-            ):
+            # a circle check with the wheel (radius 8) and each particle (3)
+            if self.furnace_particles.any_within(wheel.rect.center, 8 + 3):
                 wheel.angular_velocity += wheel.angular_acceleration * common.dt
 
             wheel.angular_velocity += wheel.drag * common.dt
@@ -671,10 +648,10 @@ class GamePlay:
                 pygame.Vector2(wheel.platform.collider_rect.topleft).elementwise()
                 // self.level.collider_cell_size
             )
-            if (grid_x, grid_y + 1) in self.extra_colliders or (
+            if (grid_x, grid_y + 1) in self.colliders.dynamic or (
                 grid_x + 1,
                 grid_y + 1,
-            ) in self.extra_colliders:
+            ) in self.colliders.dynamic:
                 wheel.platform_initial_position.y = (
                     grid_y - 2
                 ) * self.level.collider_cell_size[1]
@@ -685,8 +662,7 @@ class GamePlay:
             )
         # end wheel for loop :sobbing:
 
-        random_ahh_time = pygame.time.get_ticks()
-        to_remove = []  # because couldn't care less
+        random_ahh_time = common.ticks
         for pos, bucket in self.level.buckets.items():
             bucket.rect.top = (
                 bucket.position.y
@@ -696,16 +672,16 @@ class GamePlay:
                 )
                 * 4
             )
-            if collide_circle(
-                bucket.position + (8, 8), 8, self.player.position, 8
-            ):  # hardcoded values once again...
+        near_buckets, _, _ = self.level.proximity_index.query(
+            "buckets", self.player.position, 8
+        )  # hardcoded values once again...
+        for pos in near_buckets:
+            # picked up ones are still in the index, just not in the level anymore
+            bucket = self.level.buckets.pop(pos, None)
+            if bucket is not None:
                 self.player.inventory["buckets"].append(bucket)
-                to_remove.append(pos)
                 assets.sfx["pop"].play()
-        for pos in to_remove:
-            self.level.buckets.pop(pos)
 
-        to_remove = []  # because couldn't care less
         for pos, key in self.level.keys.items():
             key.rect.top = (
                 key.position.y
@@ -713,53 +689,49 @@ class GamePlay:
                 - math.sin((random_ahh_time + (key.position.x % 150) * 1000) / 1000 * 2)
                 * 4
             )
-            if collide_circle(
-                key.position + (8, 8), 8, self.player.position, 8
-            ):  # hardcoded values once again...
+        near_keys, _, _ = self.level.proximity_index.query(
+            "keys", self.player.position, 8
+        )
+        for pos in near_keys:
+            key = self.level.keys.pop(pos, None)
+            if key is not None:
                 self.player.inventory["keys"].append(key)
-                to_remove.append(pos)
                 assets.sfx["pop"].play()
-        for pos in to_remove:
-            self.level.keys.pop(pos)
 
-        for freezer in self.level.big_freezers.values():
-            if collide_circle(
-                pygame.Vector2(freezer.rect.center), 18, self.player.position, 10
-            ):
-                if e_just_pressed:
-                    if self.player.inventory["buckets"] and freezer.bucket is None:
-                        freezer.is_freezing_water = True
-                        freezer.bucket = self.player.inventory["buckets"].pop()
-                        assets.sfx["humm"].play()
-                    elif freezer.bucket is not None:
-                        assets.sfx["humm"].stop()
-                        assets.sfx["pop"].play()
-                        self.text_particle_manager.spawn(
-                            "CANCELLED",
-                            pygame.Vector2(freezer.rect.midtop)
-                            + pygame.Vector2(0, -10),
-                            pygame.Vector2(0, -10),
-                        )
-                        freezer.is_freezing_water = False
-                        self.player.inventory["buckets"].append(freezer.bucket)
-                        freezer.bucket = None
-                    elif not self.player.inventory["buckets"]:
-                        assets.sfx["no"].play()
-                        self.text_particle_manager.spawn(
-                            "NO BUCKETS",
-                            pygame.Vector2(freezer.rect.midtop)
-                            + pygame.Vector2(0, -10),
-                            pygame.Vector2(0, -10),
-                        )
-                if not freezer.spawned_prompt:
+        near_freezers, entered, _ = self.level.proximity_index.query(
+            "freezers", self.player.position, 10
+        )
+        for freezer_grid_pos in near_freezers:
+            freezer = self.level.big_freezers[freezer_grid_pos]
+            if e_just_pressed:
+                if self.player.inventory["buckets"] and freezer.bucket is None:
+                    freezer.is_freezing_water = True
+                    freezer.bucket = self.player.inventory["buckets"].pop()
+                    assets.sfx["humm"].play()
+                elif freezer.bucket is not None:
+                    assets.sfx["humm"].stop()
+                    assets.sfx["pop"].play()
                     self.text_particle_manager.spawn(
-                        "PRESS E",
+                        "CANCELLED",
                         pygame.Vector2(freezer.rect.midtop) + pygame.Vector2(0, -10),
                         pygame.Vector2(0, -10),
                     )
-                freezer.spawned_prompt = True
-            else:
-                freezer.spawned_prompt = False
+                    freezer.is_freezing_water = False
+                    self.player.inventory["buckets"].append(freezer.bucket)
+                    freezer.bucket = None
+                elif not self.player.inventory["buckets"]:
+                    assets.sfx["no"].play()
+                    self.text_particle_manager.spawn(
+                        "NO BUCKETS",
+                        pygame.Vector2(freezer.rect.midtop) + pygame.Vector2(0, -10),
+                        pygame.Vector2(0, -10),
+                    )
+            if freezer_grid_pos in entered:
+                self.text_particle_manager.spawn(
+                    "PRESS E",
+                    pygame.Vector2(freezer.rect.midtop) + pygame.Vector2(0, -10),
+                    pygame.Vector2(0, -10),
+                )
 
         for freezer in self.level.big_freezers.values():
             if not freezer.is_freezing_water:
@@ -783,6 +755,42 @@ class GamePlay:
         for particle_manager in self.particle_managers:
             particle_manager.update()
         self.update_camera()
+        self.update_inventory()
+
+    def get_inventory_slots(self):
+        # (item name, items, where it goes on the ui layer)
+        slots = []
+        for why_not, items in sorted(self.player.inventory.items()):
+            # even more scuffed (maybe)
+            if not items:
+                continue
+            if not isinstance(items[0], level.TextureTile):
+                raise NotImplemented("mmm")
+            item_rect = items[0].rect.move_to(topleft=(len(slots) * (16 + 2) + 2, 2))
+            slots.append((why_not, items, item_rect))
+        return slots
+
+    def update_inventory(self):
+        mouse_just_pressed = False
+        for event in common.events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == pygame.BUTTON_LEFT:
+                    mouse_just_pressed = True
+        if not mouse_just_pressed:
+            return
+
+        mouse_pos = (
+            pygame.Vector2(common.mouse_pos).elementwise() / common.window.size
+        ).elementwise() * settings.SIZE
+        for why_not, items, item_rect in self.get_inventory_slots():
+            if item_rect.collidepoint(mouse_pos):
+                if (
+                    self.player.active_item is None
+                    or self.player.active_item != why_not
+                ):
+                    self.player.active_item = why_not
+                elif self.player.active_item == why_not:
+                    self.player.active_item = None
 
     def get_colliding_cells(self, rect):
         min_x = int(rect.x // self.level.collider_cell_size[0])
@@ -794,63 +802,64 @@ class GamePlay:
             for grid_x in range(min_x, max_x + 1):
                 yield grid_x, grid_y
 
-    def rect_collides_in_grid(self, rect, grid_pos) -> bool:
-        if grid_pos not in self.colliders:
-            return False
-        return any(rect.colliderect(tile.rect) for tile in self.colliders[grid_pos])
+    def rect_collides_any(self, rect) -> bool:
+        return self.colliders.rect_collides_any(rect)
 
-    def mask_collides_in_grid(self, rect, mask, grid_pos) -> bool:
-        if grid_pos not in self.colliders:
-            return False
+    def mask_collides_any(self, rect, mask) -> bool:
+        return self.colliders.mask_collides_any(rect, mask)
 
-        return any(
-            tile.mask.overlap(mask, rect.topleft - tile.position)
-            for tile in self.colliders[grid_pos]
-        )
+    def handle_collisions(self):
+        if settings.COLLISION_RESOLVER == "swept":
+            self.handle_collisions_swept()
+        else:
+            self.handle_collisions_bfs()
 
-    @staticmethod
-    def mask_collides_in_grid_with_colliders(colliders, rect, mask, grid_pos) -> bool:
-        if grid_pos not in colliders:
-            return False
+    def handle_collisions_swept(self):
+        self.player.is_grounded = False
+        rect = self.player.collision_rect
+        mask = self.player.mask
+        previous = self.player.previous_collision_rect
+        dx, dy = rect.x - previous.x, rect.y - previous.y
 
-        return any(
-            tile.mask.overlap(mask, rect.topleft - tile.position)
-            for tile in colliders[grid_pos]
-        )
+        if not self.rect_collides_any(rect.union(previous)):
+            return
 
-    def rect_collides_any(self, rect) -> bool:
-        for grid_pos in self.get_colliding_cells(rect):
-            if grid_pos not in self.colliders:
-                continue
-            if self.rect_collides_in_grid(rect, grid_pos):
-                break
-        else:
-            return False
-        return True
+        # something moved into the player (e.g. a lift) or it got teleported into
+        # something, either way it needs pushing out instead
+        if self.mask_collides_any(previous, mask):
+            self.handle_collisions_bfs()
+            return
 
-    def mask_collides_any(self, rect, mask):
-        for grid_pos in self.get_colliding_cells(rect):
-            if grid_pos not in self.colliders:
-                continue
-            if self.mask_collides_in_grid(rect, mask, grid_pos):
-                break
-        else:
-            return False
-        return True
+        rect.topleft = previous.topleft
+
+        distance, hit_x = self.colliders.sweep(rect, dx, 0)
+        if hit_x:
+            # same slope climbing as the -9 bias in the bfs resolver gives,
+            # i.e., it can go up to 3 pixels up for every pixel it would get pushed back
+            penetration = abs(dx - distance)
+            for step in range(1, int(math.sqrt(penetration**2 + 9)) + 1):
+                if not self.mask_collides_any(rect.move(dx, -step), mask):
+                    distance = dx
+                    rect.y -= step
+                    hit_x = False
+                    break
+        rect.x += distance
 
-    def mask_collides_any_with_colliders(self, colliders, rect, mask) -> bool:
-        for grid_pos in self.get_colliding_cells(rect):
-            if grid_pos not in colliders:
-                continue
-            if self.mask_collides_in_grid_with_colliders(
-                colliders, rect, mask, grid_pos
-            ):
-                break
-        else:
-            return False
-        return True
+        distance, hit_y = self.colliders.sweep(rect, 0, dy)
+        rect.y += distance
 
-    def handle_collisions(self):
+        if hit_x:
+            self.player.velocity.x = 0
+        if hit_y:
+            self.player.velocity.y = 0
+
+        if self.mask_collides_any(rect, mask):
+            self.handle_collisions_bfs()
+            return
+
+        self.player.is_grounded = self.rect_collides_any(rect.move(0, 1))
+
+    def handle_collisions_bfs(self):
         self.player.is_grounded = False
         rect = self.player.collision_rect
         mask = self.player.mask
@@ -946,40 +955,85 @@ class GamePlay:
             self.camera.y, 0, self.level.map_size[1] - viewport_size[1]
         )
 
-    def draw(self) -> None:
-        common.renderer.draw_color = (0, 150, 150)
-        common.renderer.fill_rect((0, 0, *common.renderer.logical_size))
+    def get_visible(self, view: pygame.FRect, name: str, dct: dict) -> list:
+        # what in dct (keyed by grid position) overlaps the view, out of the few things
+        # around it that the level's spatial index found
+        visible = []
+        for grid_pos in self.draw_candidates[name]:
+            item = dct.get(grid_pos)
+            if item is not None and view.colliderect(item.rect):
+                visible.append(item)
+        self.drawn_count += len(visible)
+        self.culled_count += len(dct) - len(visible)
+        return visible
 
+    def draw(self) -> None:
         actual_camera = self.camera.copy()
+        # draw in between the last two simulation steps, see the loop in main.py
+        self.camera = self.previous_camera.lerp(self.camera, common.alpha)
         # self.camera = round(self.camera)  # dunno, kinda choppy when zoomed in
 
-        for layer_texture in self.level.tile_texture_layers:
-            layer_texture.draw(dstrect=-self.camera)
-
-        for interactives in self.level.interactives.values():
-            for tile in interactives.values():
-                tile.image.draw(dstrect=tile.rect.topleft - self.camera)
-        for grid_pos, furnace in self.level.furnaces.items():
-            if furnace.is_filled:
-                tile = self.level.filled_furnaces[grid_pos]
-                tile.image.draw(dstrect=tile.rect.topleft - self.camera)
-
-        for door in self.level.doors.values():
-            door.texture.draw(dstrect=door.rect.topleft - self.camera)
-        for key in self.level.keys.values():
-            key.image.draw(dstrect=key.rect.topleft - self.camera)
+        # only what's inside this gets drawn, see get_visible
+        view = pygame.FRect(self.camera, common.renderer.logical_size)
+        self.drawn_count = self.culled_count = 0
+        self.draw_candidates = collections.defaultdict(list)
+        for name, grid_pos in self.level.draw_index.query(view):
+            self.draw_candidates[name].append(grid_pos)
+
+        # the static layers are opaque and the camera stays inside the map, so they
+        # cover the whole screen, no need to clear it first, unless the level is
+        # smaller than the screen
+        if not pygame.FRect((0, 0), self.level.map_size).contains(view):
+            common.renderer.draw_color = settings.BACKGROUND_COLOR
+            common.renderer.fill_rect((0, 0, *common.renderer.logical_size))
+        drawn = self.level.static_texture.draw_view(view)
+        self.drawn_count += drawn
+        self.culled_count += len(self.level.static_texture.chunks) - drawn
+
+        # everything from here to the water goes through the batch, in world space
+        batch = self.batch
+        batch.begin(self.camera)
+        for name, interactives in self.level.interactives.items():
+            for tile in self.get_visible(view, name, interactives):
+                batch.draw(tile.image, tile.rect.topleft, enums.DrawLayer.INTERACTIVES)
+        filled_furnaces = {
+            grid_pos: self.level.filled_furnaces[grid_pos]
+            for grid_pos, furnace in self.level.furnaces.items()
+            if furnace.is_filled
+        }
+        for tile in self.get_visible(view, "filled_furnaces", filled_furnaces):
+            batch.draw(tile.image, tile.rect.topleft, enums.DrawLayer.FILLED_FURNACES)
+
+        for door in self.get_visible(view, "doors", self.level.doors):
+            batch.draw(door.texture, door.rect.topleft, enums.DrawLayer.DOORS)
+        for key in self.get_visible(view, "keys", self.level.keys):
+            batch.draw(key.image, key.rect.topleft, enums.DrawLayer.KEYS)
 
         for platform in self.level.lift_platforms.values():
-            platform.texture.draw(dstrect=platform.rect.topleft - self.camera)
+            if not view.colliderect(platform.rect):
+                self.culled_count += 1
+                continue
+            self.drawn_count += 1
+            batch.draw(
+                platform.texture, platform.rect.topleft, enums.DrawLayer.PLATFORMS
+            )
         for wheel in self.level.lift_wheels.values():
+            rope_rect = pygame.FRect(
+                int(wheel.platform.rect.centerx) - 1,
+                wheel.platform_min_position,
+                assets.images["rope"].width,
+                abs(wheel.platform_min_position - wheel.platform.rect.top),
+            )
+            if not (view.colliderect(wheel.rect) or view.colliderect(rope_rect)):
+                self.culled_count += 1
+                continue
+            self.drawn_count += 1
             # scuffed
-            assets.images["rope"].draw(
-                dstrect=(
-                    int(wheel.platform.rect.centerx) - 1 - self.camera.x,
-                    wheel.platform_min_position - self.camera.y,
-                    assets.images["rope"].width,
-                    abs(wheel.platform_min_position - wheel.platform.rect.top),
-                ),
+            batch.draw(
+                assets.images["rope"],
+                rope_rect.topleft,
+                enums.DrawLayer.ROPES,
+                size=rope_rect.size,
                 srcrect=(
                     0,
                     assets.images["rope"].height
@@ -1011,22 +1065,38 @@ class GamePlay:
             # )
             # alr, scrap this, we're using the background for this, I can't... :sobbing:
 
-            wheel.texture.draw(
-                dstrect=wheel.rect.topleft - self.camera, angle=wheel.angle
+            batch.draw(
+                wheel.texture,
+                wheel.rect.topleft,
+                enums.DrawLayer.WHEELS,
+                angle=wheel.angle,
             )
 
-        for tiles in self.extra_colliders.values():
+        # placed ice cubes, there's only ever a handful
+        for tiles in self.colliders.dynamic.values():
             for texture_tile in tiles:
-                texture_tile.image.draw(dstrect=texture_tile.rect.topleft - self.camera)
+                if not view.colliderect(texture_tile.rect):
+                    self.culled_count += 1
+                    continue
+                self.drawn_count += 1
+                batch.draw(
+                    texture_tile.image,
+                    texture_tile.rect.topleft,
+                    enums.DrawLayer.ICE_CUBES,
+                )
 
-        for tile in self.level.teleports.values():
-            tile.image.draw(dstrect=tile.rect.topleft - self.camera)
+        for tile in self.get_visible(view, "teleports", self.level.teleports):
+            batch.draw(tile.image, tile.rect.topleft, enums.DrawLayer.TELEPORTS)
 
         for texture_tile in self.extra_cleared_decorations.values():
-            texture_tile.image.draw(dstrect=texture_tile.rect.topleft - self.camera)
+            batch.draw(
+                texture_tile.image,
+                texture_tile.rect.topleft,
+                enums.DrawLayer.DECORATIONS,
+            )
 
         # render the loading bar in front of the cubes
-        random_ahh_time = pygame.time.get_ticks()
+        random_ahh_time = common.ticks
         for freezer in self.level.big_freezers.values():
             if freezer.loading_bar_image is None:
                 continue
@@ -1034,33 +1104,41 @@ class GamePlay:
                 freezer.loading_bar_position.x
                 + math.sin(random_ahh_time / 1000 * 70) * 1
             )
-            freezer.loading_bar_image.draw(
-                dstrect=freezer.loading_bar_rect.topleft - self.camera
+            batch.draw(
+                freezer.loading_bar_image,
+                freezer.loading_bar_rect.topleft,
+                enums.DrawLayer.LOADING_BARS,
             )
 
         for particle_manager in self.particle_managers:
-            particle_manager.render(self.camera)
+            drawn = particle_manager.render(self.camera, batch=batch)
+            self.drawn_count += drawn
+            self.culled_count += len(particle_manager) - drawn
 
-        for (endpoint,) in self.level.endpoint.values():
-            endpoint.image.draw(dstrect=endpoint.rect.topleft - self.camera)
+        endpoints = {pos: tile for pos, (tile,) in self.level.endpoint.items()}
+        for endpoint in self.get_visible(view, "endpoint", endpoints):
+            batch.draw(endpoint.image, endpoint.rect.topleft, enums.DrawLayer.ENDPOINT)
 
+        player_offset = (
+            self.player.previous_position.lerp(self.player.position, common.alpha)
+            - self.player.position
+        )
         player_texture = self.player.animation.update(self.player.state)
-        player_texture.draw(
-            dstrect=self.player.rect.topleft - self.camera, flip_x=self.player.flip
+        batch.draw(
+            player_texture,
+            self.player.rect.topleft + player_offset,
+            enums.DrawLayer.PLAYER,
+            flip_x=self.player.flip,
         )
+        batch.flush()
 
-        self.level.water_texture.draw(dstrect=-self.camera)
-        for pool in self.level.pools.values():
-            pool.texture.draw(dstrect=pool.position - self.camera)
-
-        mouse_pos = (
-            pygame.Vector2(pygame.mouse.get_pos()).elementwise() / common.window.size
-        ).elementwise() * settings.SIZE
-        mouse_just_pressed = False
-        for event in common.events:
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == pygame.BUTTON_LEFT:
-                    mouse_just_pressed = True
+        drawn = self.level.water_texture.draw_view(view)
+        self.drawn_count += drawn
+        self.culled_count += len(self.level.water_texture.chunks) - drawn
+        batch.begin(self.camera)
+        for pool in self.get_visible(view, "pools", self.level.pools):
+            batch.draw(pool.texture, pool.position, enums.DrawLayer.POOLS)
+        batch.flush()
 
         current_target = common.renderer.target
         current_color = common.renderer.draw_color
@@ -1069,33 +1147,25 @@ class GamePlay:
         common.renderer.clear()
         common.renderer.draw_color = current_color
 
-        yep = 0
-        for why_not, items in sorted(self.player.inventory.items()):
-            # even more scuffed (maybe)
-            if not items:
-                continue
-            if isinstance(items[0], level.TextureTile):
-                item_rect = items[0].rect.move_to(topleft=(yep * (16 + 2) + 2, 2))
-                if mouse_just_pressed and item_rect.collidepoint(mouse_pos):
-                    if (
-                        self.player.active_item is None
-                        or self.player.active_item != why_not
-                    ):
-                        self.player.active_item = why_not
-                    elif self.player.active_item == why_not:
-                        self.player.active_item = None
-                if self.player.active_item == why_not:
-                    assets.images["item_frame_selected"].draw(dstrect=item_rect)
-                else:
-                    assets.images["item_frame"].draw(dstrect=item_rect)
-                items[0].image.draw(dstrect=item_rect)
-                texture, rect = get_number_as_texture(len(items))
-                texture.draw(
-                    dstrect=rect.move_to(midtop=item_rect.move(0, 2).midbottom)
-                )
+        batch.begin()
+        for why_not, items, item_rect in self.get_inventory_slots():
+            if self.player.active_item == why_not:
+                frame = assets.images["item_frame_selected"]
             else:
-                raise NotImplemented("mmm")
-            yep += 1
+                frame = assets.images["item_frame"]
+            batch.draw(
+                frame, item_rect.topleft, enums.DrawLayer.UI, size=item_rect.size
+            )
+            batch.draw(
+                items[0].image,
+                item_rect.topleft,
+                enums.DrawLayer.UI_ICONS,
+                size=item_rect.size,
+            )
+            texture, rect = get_number_as_texture(len(items))
+            rect = rect.move_to(midtop=item_rect.move(0, 2).midbottom)
+            batch.draw(texture, rect.topleft, enums.DrawLayer.UI_TEXT, size=rect.size)
+        batch.flush()
 
         common.renderer.target = current_target
 
@@ -0,0 +1,56 @@
+import concurrent.futures
+import time
+
+import pygame
+
+from src import assets, common, settings
+
+
+class Loading:
+    # builds the next state a bit at a time instead of freezing the window until
+    # it's done, state_class.load() is a generator (see common.run_steps) that
+    # returns the state, whatever is left of the frame budget goes to the next frame
+    asset_groups = ("loading",)
+
+    def __init__(self, state_class):
+        # the state's own assets get loaded in the steps too, they're only reserved
+        # here so whatever the current state shares with it doesn't get dropped
+        self.state_groups = state_class.asset_groups
+        assets.reserve(*self.state_groups)
+        self.steps = self.load(state_class)
+        self.waiting_on: concurrent.futures.Future | None = None
+        self.progress = 0.0
+        self.frames = assets.images["freezer_loading_bar"]["thingy"]
+
+    def load(self, state_class):
+        yield from assets.load_groups(*self.state_groups)
+        return (yield from state_class.load())
+
+    def update(self) -> None:
+        deadline = time.perf_counter() + settings.LOADING_FRAME_BUDGET
+        while time.perf_counter() < deadline:
+            if self.waiting_on is not None:
+                if not self.waiting_on.done():
+                    # it's on the pool, no point in spinning here meanwhile
+                    return
+                self.waiting_on = None
+            try:
+                step = next(self.steps)
+            except StopIteration as stop:
+                common.set_current_state(stop.value)
+                assets.release(*self.state_groups)
+                return
+            if isinstance(step, concurrent.futures.Future):
+                self.waiting_on = step
+            elif step is not None:
+                self.progress = step
+
+    def draw(self) -> None:
+        frame = self.frames[round(self.progress * (len(self.frames) - 1))]["image"]
+        # the bar is tiny, it's for a freezer
+        size = frame.width * 4, frame.height * 4
+        frame.draw(
+            dstrect=pygame.Rect((0, 0), size).move_to(
+                center=(settings.WIDTH / 2, settings.HEIGHT / 2)
+            )
+        )
@@ -14,9 +14,11 @@ from src import player, settings, common, enums, animation, assets, level, parti
 
 
 class MainMenu:
+    asset_groups = ("menu",)
+
     def __init__(self):
         # mmmm
-        from . import GamePlay, Tutorial
+        from . import GamePlay, Loading, Tutorial
 
         self.ui_manager = ui.UIManager()
         self.ui_manager.add(
@@ -24,7 +26,7 @@ class MainMenu:
                 (settings.WIDTH / 2, settings.HEIGHT / 2 - 24 - 48),
                 "PLAY",
                 pressed_image=assets.images["button_pressed_green_surf"],
-                callback=lambda: common.set_current_state(GamePlay())
+                callback=lambda: common.set_current_state(Loading(GamePlay))
             ),
             initial_selected=True,
         ).add(
@@ -32,7 +34,7 @@ class MainMenu:
                 (settings.WIDTH / 2, settings.HEIGHT / 2 - 24),
                 "TUTORIAL",
                 pressed_image=assets.images["button_pressed_yellow_surf"],
-                callback=lambda: common.set_current_state(Tutorial()),
+                callback=lambda: common.set_current_state(Loading(Tutorial)),
             ),
             ui.Button(
                 (settings.WIDTH / 2, settings.HEIGHT / 2 + 24),
@@ -57,6 +59,8 @@ class MainMenu:
 
 
 class Settings:
+    asset_groups = ("menu",)
+
     def __init__(self):
         self.ui_manager = ui.UIManager()
         self.ui_manager.add(
@@ -2,6 +2,9 @@ from typing import Protocol
 
 
 class State(Protocol):
+    # names from assets.GROUPS, loaded while the state is current
+    asset_groups: tuple[str, ...]
+
     def update(self) -> None:
         ...
 
@@ -1,7 +1,7 @@
 import pygame
 import pygame._sdl2 as pg_sdl2  # noqa
 
-from . import common, settings, assets
+from . import common, settings, assets, enums, glyphs
 
 
 class UIManager:
@@ -73,7 +73,29 @@ class UIManager:
         elif self.selector_arrow.last_selection is None:
             self.selector_arrow.shown = False
 
-    def draw(self, target: pg_sdl2.Texture | None = None) -> None:
+    def draw(self, target: pg_sdl2.Texture | None = None, batch=None) -> None:
+        if batch is not None:
+            # ends up on whatever the target is when the batch gets flushed
+            for widget in self.widgets:
+                batch.draw(
+                    widget.image,
+                    widget.rect.topleft,
+                    enums.DrawLayer.UI,
+                    size=widget.rect.size,
+                    alpha=150,
+                    screen=True,
+                )
+            if self.selector_arrow.shown:
+                batch.draw(
+                    self.selector_arrow.image,
+                    self.selector_arrow.rect.topleft,
+                    enums.DrawLayer.UI,
+                    size=self.selector_arrow.rect.size,
+                    alpha=150,
+                    screen=True,
+                )
+            return
+
         current_target = common.renderer.target
         common.renderer.target = target
 
@@ -102,13 +124,13 @@ class Label:
     def __init__(self, position, text: str, font: pygame.Font | None = None) -> None:
         self.position = pygame.Vector2(position)
         font = assets.fonts["pixelify_semibold"][18] if font is None else font
-        text_surf = font.render(text, False, "#050e1a")
+        text_surf = glyphs.get(font, "#050e1a").render_surface(text)
         self.image = assets.images["button_surf"].copy()
         self.rect = self.image.get_rect(center=position)
         self.image.blit(
             text_surf, text_surf.get_rect(center=self.image.get_rect().center)
         )
-        self.image = pg_sdl2.Texture.from_surface(common.renderer, self.image)
+        self.image = common.Texture.from_surface(common.renderer, self.image)
 
     def update(self):
         pass
@@ -125,12 +147,12 @@ class Button:
     ) -> None:
         self.position = pygame.Vector2(position)
         font = assets.fonts["pixelify_semibold"][18] if font is None else font
-        text_surf = font.render(text, False, "#050e1a")
+        text_surf = glyphs.get(font, "#050e1a").render_surface(text)
 
         surf = assets.images["button_surf"].copy()
         self.rect = surf.get_rect(center=position)
         surf.blit(text_surf, text_surf.get_rect(center=surf.get_rect().center))
-        self.idle = pg_sdl2.Texture.from_surface(common.renderer, surf)
+        self.idle = common.Texture.from_surface(common.renderer, surf)
 
         surf = (
             assets.images["button_pressed_surf"]
@@ -139,7 +161,7 @@ class Button:
         ).copy()
         self.rect = surf.get_rect(center=position)
         surf.blit(text_surf, text_surf.get_rect(center=surf.get_rect().center))
-        self.pressed = pg_sdl2.Texture.from_surface(common.renderer, surf)
+        self.pressed = common.Texture.from_surface(common.renderer, surf)
 
         self.image = self.idle
         self.callback = callback